@@ -70,6 +70,7 @@ def _config_secrets_get(
 class AppConfig:
     ALLOW_TESTS = decouple.config("ALLOW_TESTS", default=False, cast=bool)
     DISABLE_CHECK_CACHE = decouple.config("DISABLE_CHECK_CACHE", default=False, cast=bool)
+    ALEMBIC_CHECK_ON_STARTUP = decouple.config("ALEMBIC_CHECK_ON_STARTUP", default=False, cast=bool)
     APP_HOST = decouple.config("APP_HOST", default="127.0.0.1")
     SSH_HOST = decouple.config("SSH_HOST", default="0.0.0.0")
     SSH_PORT = decouple.config("SSH_PORT", default=2222, cast=int)
@@ -139,6 +140,7 @@ class AppConfig:
 
 
 class DebugConfig(AppConfig):
+    ALEMBIC_CHECK_ON_STARTUP = decouple.config("ALEMBIC_CHECK_ON_STARTUP", default=True, cast=bool)
     DEBUG = True
     TEMPLATES_AUTO_RELOAD = True
     USE_BLOCKBUSTER = False
@@ -17,7 +17,10 @@
 
 from __future__ import annotations
 
+import asyncio
 import contextlib
+import contextvars
+import fcntl
 import functools
 import os
 from typing import TYPE_CHECKING, Any, Concatenate, Final, TypeGuard, TypeVar
@@ -26,8 +29,10 @@ import alembic.command as command
 import alembic.config as alembic_config
 import sqlalchemy
 import sqlalchemy.dialects.sqlite
+import sqlalchemy.event
 import sqlalchemy.ext.asyncio
 import sqlalchemy.orm as orm
+import sqlalchemy.pool
 import sqlalchemy.sql
 import sqlmodel
 import sqlmodel.sql.expression as expression
@@ -40,13 +45,42 @@ import atr.util as util
 
 if TYPE_CHECKING:
     import datetime
-    from collections.abc import Awaitable, Callable, Iterator, Sequence
+    from collections.abc import AsyncGenerator, Awaitable, Callable, Iterator, Sequence
 
     import asfquart.base as base
 
-global_log_query: bool = False
+# Set SQLite pragmas for better performance
+# Use 64 MB for the cache_size, and 5000ms for busy_timeout
+# Keep temporary tables and indices in memory, and allow 256 MB of mmap I/O
+_CONNECTION_PRAGMAS: Final = """
+PRAGMA synchronous=NORMAL;
+PRAGMA cache_size=-64000;
+PRAGMA foreign_keys=ON;
+PRAGMA busy_timeout=5000;
+PRAGMA strict=ON;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+"""
+# Whether to log all queries in the current context, as set by log_queries
+# This is a context variable so that concurrent requests do not affect each other
+_LOG_QUERIES: Final[contextvars.ContextVar[bool]] = contextvars.ContextVar("log_queries", default=False)
+_OPTIMIZE_INTERVAL_SECONDS: Final = 15 * 60
+# The SQLAlchemy default
+# Nested sessions each need their own connection, so we do not limit this to a single writer
+_WRITE_POOL_SIZE: Final = 5
+# The read only session shared by the current request, and the task which opened it
+_CURRENT_SESSION: Final[contextvars.ContextVar[tuple[Session, asyncio.Task[Any] | None] | None]] = (
+    contextvars.ContextVar("current_session", default=None)
+)
+
 _global_atr_engine: sqlalchemy.ext.asyncio.AsyncEngine | None = None
-_global_atr_sessionmaker: sqlalchemy.ext.asyncio.async_sessionmaker | None = None
+_global_atr_engine_readonly: sqlalchemy.ext.asyncio.AsyncEngine | None = None
+_global_atr_sessionmaker: sqlalchemy.ext.asyncio.async_sessionmaker[Session] | None = None
+_global_atr_sessionmaker_readonly: sqlalchemy.ext.asyncio.async_sessionmaker[Session] | None = None
+# The ids of mapped attributes which have already passed _validate_entity
+# Mapped attributes live as long as their classes, so their ids are never reused
+_global_validated_entity_ids: set[int] = set()
+_global_optimize_task: asyncio.Task[None] | None = None
 
 
 T = TypeVar("T")
@@ -61,6 +95,10 @@ class NotSet:
 
     _instance = None
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        # NOT_SET must be the only instance, so that it can be checked by identity
+        raise TypeError("NotSet cannot be subclassed")
+
     def __new__(cls) -> NotSet:
         if cls._instance is None:
             cls._instance = super().__new__(cls)
@@ -79,33 +117,80 @@ class NotSet:
 NOT_SET: Final[NotSet] = NotSet()
 type Opt[T] = T | NotSet
 
+# Select statements are immutable, so the base statements of frequently used queries can be shared
+_TEXT_VALUE_SELECT: Final = sqlmodel.select(sql.TextValue)
+_WORKFLOW_SSH_KEY_SELECT: Final = sqlmodel.select(sql.WorkflowSSHKey)
+_WORKFLOW_STATUS_SELECT: Final = sqlmodel.select(sql.WorkflowStatus)
+
+# Columns of the equality criteria accepted by the frequently used query helpers
+# These must be in the same order as the corresponding arguments of each helper
+_TEXT_VALUE_NS: Final = sql.validate_instrumented_attribute(sql.TextValue.ns)
+_TEXT_VALUE_KEY: Final = sql.validate_instrumented_attribute(sql.TextValue.key)
+_TEXT_VALUE_VALUE: Final = sql.validate_instrumented_attribute(sql.TextValue.value)
+_TEXT_VALUE_COLUMNS: Final = (_TEXT_VALUE_NS, _TEXT_VALUE_KEY, _TEXT_VALUE_VALUE)
+_WORKFLOW_SSH_KEY_COLUMNS: Final = tuple(
+    sql.validate_instrumented_attribute(column)
+    for column in (
+        sql.WorkflowSSHKey.fingerprint,
+        sql.WorkflowSSHKey.key,
+        sql.WorkflowSSHKey.project_name,
+        sql.WorkflowSSHKey.expires,
+        sql.WorkflowSSHKey.asf_uid,
+        sql.WorkflowSSHKey.github_uid,
+        sql.WorkflowSSHKey.github_nid,
+    )
+)
+_WORKFLOW_STATUS_COLUMNS: Final = tuple(
+    sql.validate_instrumented_attribute(column)
+    for column in (
+        sql.WorkflowStatus.workflow_id,
+        sql.WorkflowStatus.run_id,
+        sql.WorkflowStatus.project_name,
+        sql.WorkflowStatus.task_id,
+        sql.WorkflowStatus.status,
+    )
+)
+_WORKFLOW_STATUS_STATUS: Final = sql.validate_instrumented_attribute(sql.WorkflowStatus.status)
+
+# Looking up the status of a single workflow run is the most common workflow_status query
+# This statement is built once, and its parameters are bound when it is executed
+_WORKFLOW_STATUS_BY_RUN: Final = (
+    _WORKFLOW_STATUS_SELECT.where(sql.WorkflowStatus.workflow_id == sqlalchemy.bindparam("workflow_id"))
+    .where(sql.WorkflowStatus.run_id == sqlalchemy.bindparam("run_id"))
+    .where(sql.WorkflowStatus.project_name == sqlalchemy.bindparam("project_name"))
+)
+
 
 class Query[T]:
-    def __init__(self, session: Session, query: expression.SelectOfScalar[T]):
+    def __init__(
+        self, session: Session, query: expression.SelectOfScalar[T], params: dict[str, Any] | None = None
+    ) -> None:
         self.query = query
         self.session = session
+        self.params = params
 
     def order_by(self, *args: Any, **kwargs: Any) -> Query[T]:
         self.query = self.query.order_by(*args, **kwargs)
         return self
 
     def log_query(self, method_name: str, log_query: bool) -> None:
-        if not (self.session.log_queries or global_log_query or log_query):
+        if not (self.session.log_queries or _LOG_QUERIES.get() or log_query):
             return
         try:
-            compiled_query = self.query.compile(self.session.bind, compile_kwargs={"literal_binds": True})
+            query = self.query if (self.params is None) else self.query.params(self.params)
+            compiled_query = query.compile(self.session.bind, compile_kwargs={"literal_binds": True})
             log.info(f"Executing query ({method_name}): {compiled_query}")
         except Exception as e:
             log.error(f"Error compiling query for logging ({method_name}): {e}")
 
     async def get(self, log_query: bool = False) -> T | None:
         self.log_query("get", log_query)
-        result = await self.session.execute(self.query)
+        result = await self.session.execute(self.query, self.params)
         return result.unique().scalar_one_or_none()
 
     async def demand(self, error: Exception, log_query: bool = False) -> T:
         self.log_query("demand", log_query)
-        result = await self.session.execute(self.query)
+        result = await self.session.execute(self.query, self.params)
         item = result.unique().scalar_one_or_none()
         if item is None:
             raise error
@@ -113,9 +198,18 @@ class Query[T]:
 
     async def all(self, log_query: bool = False) -> Sequence[T]:
         self.log_query("all", log_query)
-        result = await self.session.execute(self.query)
+        result = await self.session.execute(self.query, self.params)
         return result.scalars().all()
 
+    async def stream(self, yield_per: int = 250, log_query: bool = False) -> AsyncGenerator[T]:
+        # The get, demand, and all methods fetch every row from the aiosqlite thread at once
+        # Streaming fetches rows in batches of yield_per, so that large results are not held in memory
+        self.log_query("stream", log_query)
+        query = self.query.execution_options(yield_per=yield_per)
+        result = await self.session.stream_scalars(query, self.params)
+        async for item in result:
+            yield item
+
     async def bulk_upsert(self, items: list[schema.Strict], log_query: bool = False) -> None:
         if not items:
             return
@@ -143,7 +237,7 @@ class Session(sqlalchemy.ext.asyncio.AsyncSession):
         explicit_value_passed_by_sessionmaker = kwargs.pop("log_queries", None)
         super().__init__(*args, **kwargs)
 
-        self.log_queries: bool = global_log_query
+        self.log_queries: bool = _LOG_QUERIES.get()
         if explicit_value_passed_by_sessionmaker is not None:
             self.log_queries = explicit_value_passed_by_sessionmaker
 
@@ -304,7 +398,7 @@ class Session(sqlalchemy.ext.asyncio.AsyncSession):
         return Query(self, query)
 
     async def execute_query(self, query: sqlalchemy.sql.expression.Executable) -> sqlalchemy.engine.Result:
-        if (self.log_queries or global_log_query) and isinstance(query, sqlalchemy.sql.expression.Select):
+        if (self.log_queries or _LOG_QUERIES.get()) and isinstance(query, sqlalchemy.sql.expression.Select):
             try:
                 dialect = self.bind.dialect if self.bind else sqlalchemy.dialects.sqlite.dialect()
                 compiled_query = query.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
@@ -316,8 +410,8 @@ class Session(sqlalchemy.ext.asyncio.AsyncSession):
 
     async def ns_text_del(self, ns: str, key: str, commit: bool = True) -> None:
         stmt = sqlalchemy.delete(sql.TextValue).where(
-            sql.validate_instrumented_attribute(sql.TextValue.ns) == ns,
-            sql.validate_instrumented_attribute(sql.TextValue.key) == key,
+            _TEXT_VALUE_NS == ns,
+            _TEXT_VALUE_KEY == key,
         )
         await self.execute(stmt)
         if commit is True:
@@ -325,7 +419,7 @@ class Session(sqlalchemy.ext.asyncio.AsyncSession):
 
     async def ns_text_del_all(self, ns: str, commit: bool = True) -> None:
         stmt = sqlalchemy.delete(sql.TextValue).where(
-            sql.validate_instrumented_attribute(sql.TextValue.ns) == ns,
+            _TEXT_VALUE_NS == ns,
         )
         await self.execute(stmt)
         if commit is True:
@@ -333,8 +427,8 @@ class Session(sqlalchemy.ext.asyncio.AsyncSession):
 
     async def ns_text_get(self, ns: str, key: str) -> str | None:
         stmt = sqlalchemy.select(sql.TextValue).where(
-            sql.validate_instrumented_attribute(sql.TextValue.ns) == ns,
-            sql.validate_instrumented_attribute(sql.TextValue.key) == key,
+            _TEXT_VALUE_NS == ns,
+            _TEXT_VALUE_KEY == key,
         )
         result = await self.execute(stmt)
         match result.scalar_one_or_none():
@@ -709,14 +803,11 @@ class Session(sqlalchemy.ext.asyncio.AsyncSession):
         key: Opt[str] = NOT_SET,
         value: Opt[str] = NOT_SET,
     ) -> Query[sql.TextValue]:
-        query = sqlmodel.select(sql.TextValue)
+        query = _TEXT_VALUE_SELECT
 
-        if is_defined(ns):
-            query = query.where(sql.TextValue.ns == ns)
-        if is_defined(key):
-            query = query.where(sql.TextValue.key == key)
-        if is_defined(value):
-            query = query.where(sql.TextValue.value == value)
+        for column, criterion in zip(_TEXT_VALUE_COLUMNS, (ns, key, value), strict=True):
+            if criterion is not NOT_SET:
+                query = query.where(column == criterion)
 
         return Query(self, query)
 
@@ -730,22 +821,12 @@ class Session(sqlalchemy.ext.asyncio.AsyncSession):
         github_uid: Opt[str] = NOT_SET,
         github_nid: Opt[int] = NOT_SET,
     ) -> Query[sql.WorkflowSSHKey]:
-        query = sqlmodel.select(sql.WorkflowSSHKey)
+        query = _WORKFLOW_SSH_KEY_SELECT
 
-        if is_defined(fingerprint):
-            query = query.where(sql.WorkflowSSHKey.fingerprint == fingerprint)
-        if is_defined(key):
-            query = query.where(sql.WorkflowSSHKey.key == key)
-        if is_defined(project_name):
-            query = query.where(sql.WorkflowSSHKey.project_name == project_name)
-        if is_defined(expires):
-            query = query.where(sql.WorkflowSSHKey.expires == expires)
-        if is_defined(asf_uid):
-            query = query.where(sql.WorkflowSSHKey.asf_uid == asf_uid)
-        if is_defined(github_uid):
-            query = query.where(sql.WorkflowSSHKey.github_uid == github_uid)
-        if is_defined(github_nid):
-            query = query.where(sql.WorkflowSSHKey.github_nid == github_nid)
+        criteria = (fingerprint, key, project_name, expires, asf_uid, github_uid, github_nid)
+        for column, criterion in zip(_WORKFLOW_SSH_KEY_COLUMNS, criteria, strict=True):
+            if criterion is not NOT_SET:
+                query = query.where(column == criterion)
 
         return Query(self, query)
 
@@ -758,55 +839,86 @@ class Session(sqlalchemy.ext.asyncio.AsyncSession):
         status: Opt[str] = NOT_SET,
         status_in: Opt[list[str]] = NOT_SET,
     ) -> Query[sql.WorkflowStatus]:
-        via = sql.validate_instrumented_attribute
-        query = sqlmodel.select(sql.WorkflowStatus)
-
-        if is_defined(workflow_id):
-            query = query.where(sql.WorkflowStatus.workflow_id == workflow_id)
-        if is_defined(run_id):
-            query = query.where(sql.WorkflowStatus.run_id == run_id)
-        if is_defined(project_name):
-            query = query.where(sql.WorkflowStatus.project_name == project_name)
-        if is_defined(task_id):
-            query = query.where(sql.WorkflowStatus.task_id == task_id)
-        if is_defined(status):
-            query = query.where(sql.WorkflowStatus.status == status)
+        if (
+            (workflow_id is not NOT_SET)
+            and (run_id is not NOT_SET)
+            and (project_name is not NOT_SET)
+            and (task_id is NOT_SET)
+            and (status is NOT_SET)
+            and (status_in is NOT_SET)
+        ):
+            params = {"workflow_id": workflow_id, "run_id": run_id, "project_name": project_name}
+            return Query(self, _WORKFLOW_STATUS_BY_RUN, params)
+
+        query = _WORKFLOW_STATUS_SELECT
+
+        criteria = (workflow_id, run_id, project_name, task_id, status)
+        for column, criterion in zip(_WORKFLOW_STATUS_COLUMNS, criteria, strict=True):
+            if criterion is not NOT_SET:
+                query = query.where(column == criterion)
         if is_defined(status_in):
-            query = query.where(via(sql.WorkflowStatus.status).in_(status_in))
+            query = query.where(_WORKFLOW_STATUS_STATUS.in_(status_in))
 
         return Query(self, query)
 
 
-async def create_async_engine(app_config: type[config.AppConfig]) -> sqlalchemy.ext.asyncio.AsyncEngine:
-    absolute_db_path = os.path.join(app_config.STATE_DIR, app_config.SQLITE_DB_PATH)
+async def create_async_engine(absolute_db_path: str, readonly: bool = False) -> sqlalchemy.ext.asyncio.AsyncEngine:
     # Three slashes are required before either a relative or absolute path
-    sqlite_url = f"sqlite+aiosqlite:///{absolute_db_path}"
+    if readonly is True:
+        # SQLite refuses all writes on connections opened with mode=ro
+        # Under WAL these readers never contend with the writer for a lock
+        sqlite_url = f"sqlite+aiosqlite:///file:{absolute_db_path}?mode=ro&uri=true"
+        # Readers can run in parallel, so keep enough connections for every CPU
+        pool_size = max(4, os.cpu_count() or 1)
+    else:
+        sqlite_url = f"sqlite+aiosqlite:///{absolute_db_path}"
+        pool_size = _WRITE_POOL_SIZE
     # Use aiosqlite for async SQLite access
+    # The query helpers produce many combinations of criteria, so use a larger compiled query cache
     engine = sqlalchemy.ext.asyncio.create_async_engine(
         sqlite_url,
         connect_args={
             "check_same_thread": False,
             "timeout": 30,
         },
+        poolclass=sqlalchemy.pool.AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        query_cache_size=2048,
     )
 
-    # Set SQLite pragmas for better performance
-    # Use 64 MB for the cache_size, and 5000ms for busy_timeout
-    async with engine.begin() as conn:
-        await conn.execute(sqlalchemy.text("PRAGMA journal_mode=WAL"))
-        await conn.execute(sqlalchemy.text("PRAGMA synchronous=NORMAL"))
-        await conn.execute(sqlalchemy.text("PRAGMA cache_size=-64000"))
-        await conn.execute(sqlalchemy.text("PRAGMA foreign_keys=ON"))
-        await conn.execute(sqlalchemy.text("PRAGMA busy_timeout=5000"))
-        await conn.execute(sqlalchemy.text("PRAGMA strict=ON"))
+    # Most SQLite pragmas only apply to the connection that sets them
+    # Therefore we set them on every connection that the pool opens
+    sqlalchemy.event.listen(engine.sync_engine, "connect", _set_connection_pragmas)
+
+    # The journal_mode pragma is persistent, so it only needs to be set once
+    # It cannot be set from a read only connection
+    if readonly is False:
+        async with engine.begin() as conn:
+            await conn.execute(sqlalchemy.text("PRAGMA journal_mode=WAL"))
+    else:
+        # Open the pooled connections now, so that requests do not wait for aiosqlite threads to start
+        connections = await asyncio.gather(*(engine.connect() for _ in range(pool_size)))
+        for connection in connections:
+            await connection.close()
 
     return engine
 
 
-def ensure_session(caller_data: Session | None) -> Session | contextlib.nullcontext[Session]:
-    if caller_data is None:
-        return session()
-    return contextlib.nullcontext(caller_data)
+def ensure_session(caller_data: Session | None, readonly: bool = False) -> Session | contextlib.nullcontext[Session]:
+    """
+    Use the session of the caller, or else open a new session.
+
+    Callers which only read may pass readonly, to share the read only session of
+    the current request instead, if there is one. Otherwise they get a new read
+    only session.
+    """
+    if caller_data is not None:
+        return contextlib.nullcontext(caller_data)
+    if readonly:
+        current = _current_session()
+        if current is not None:
+            return contextlib.nullcontext(current)
+    return session(readonly=readonly)
 
 
 async def get_project_release_policy(data: Session, project_name: str) -> sql.ReleasePolicy | None:
@@ -827,23 +939,18 @@ def init_database(app: base.QuartApp) -> None:
 
     @app.before_serving
     async def create() -> None:
-        global _global_atr_engine, _global_atr_sessionmaker
+        global _global_optimize_task
 
         app_config = config.get()
-        engine = await create_async_engine(app_config)
-        _global_atr_engine = engine
-
-        _global_atr_sessionmaker = sqlalchemy.ext.asyncio.async_sessionmaker(
-            bind=engine, class_=Session, expire_on_commit=False
-        )
+        absolute_db_path = _absolute_db_path(app_config)
 
-        # Run any pending migrations on startup
+        # Run any pending migrations on startup, before the engines open any connections
+        # Alembic uses its own synchronous connection, which is closed when each command finishes
         log.info("Applying database migrations via init_database...")
         alembic_ini_path = os.path.join(app_config.PROJECT_ROOT, "alembic.ini")
         alembic_cfg = alembic_config.Config(alembic_ini_path)
 
         # Construct synchronous URLs
-        absolute_db_path = os.path.join(app_config.STATE_DIR, app_config.SQLITE_DB_PATH)
         sync_sqlalchemy_url = f"sqlite:///{absolute_db_path}"
         log.info(f"Setting Alembic URL for command: {sync_sqlalchemy_url}")
         alembic_cfg.set_main_option("sqlalchemy.url", sync_sqlalchemy_url)
@@ -855,70 +962,72 @@ def init_database(app: base.QuartApp) -> None:
 
         try:
             log.info("Running alembic upgrade head...")
-            command.upgrade(alembic_cfg, "head")
+            _alembic_upgrade(alembic_cfg, str(app_config.STATE_DIR))
             log.info("Database migrations applied successfully")
         except Exception:
             log.exception("Failed to apply database migrations during startup")
             raise
 
-        try:
-            log.info("Running alembic check...")
-            command.check(alembic_cfg)
-            log.info("Alembic check passed: DB schema matches models")
-        except Exception:
-            log.exception("Failed to check database migrations during startup")
-            raise
+        # The check autogenerates a diff against every model, which is slow
+        # It is enabled by default in Debug mode only
+        if app_config.ALEMBIC_CHECK_ON_STARTUP:
+            try:
+                log.info("Running alembic check...")
+                command.check(alembic_cfg)
+                log.info("Alembic check passed: DB schema matches models")
+            except Exception:
+                log.exception("Failed to check database migrations during startup")
+                raise
 
+        await _create_engines(absolute_db_path)
 
-async def init_database_for_worker() -> None:
-    global _global_atr_engine, _global_atr_sessionmaker
+        # Keep the query planner statistics up to date while the server runs
+        _global_optimize_task = asyncio.create_task(_optimize_periodically())
 
+
+async def init_database_for_worker() -> None:
     log.info(f"Creating database for worker {os.getpid()}")
-    engine = await create_async_engine(config.get())
-    _global_atr_engine = engine
-    _global_atr_sessionmaker = sqlalchemy.ext.asyncio.async_sessionmaker(
-        bind=engine, class_=Session, expire_on_commit=False
-    )
+    await _create_engines(_absolute_db_path(config.get()))
 
 
 def is_defined[T](v: T | NotSet) -> TypeGuard[T]:
-    return not isinstance(v, NotSet)
+    return v is not NOT_SET
 
 
 def is_undefined(v: object | NotSet) -> TypeGuard[NotSet]:
-    return isinstance(v, NotSet)
+    return v is NOT_SET
 
 
 def joined_load(*entities: Any) -> orm.strategy_options._AbstractLoad:
     """Eagerly load the given entities from the query using joinedload."""
-    validated_entities = []
     for entity in entities:
-        if not isinstance(entity, orm.InstrumentedAttribute):
-            raise ValueError(f"Object must be an orm.InstrumentedAttribute, got: {type(entity)}")
-        validated_entities.append(entity)
-    return orm.joinedload(*validated_entities)
+        _validate_entity(entity, "Object")
+    return orm.joinedload(*entities)
 
 
 def joined_load_nested(parent: Any, *descendants: Any) -> orm.strategy_options._AbstractLoad:
-    """Eagerly load the given nested entities from the query using joinedload."""
-    if not isinstance(parent, orm.InstrumentedAttribute):
-        raise ValueError(f"Parent must be an orm.InstrumentedAttribute, got: {type(parent)}")
+    """
+    Eagerly load the given nested entities from the query using joinedload.
+
+    Any collection in the path is loaded using selectinload instead, to avoid multiplying rows.
+    """
+    _validate_entity(parent, "Parent")
+    for descendant in descendants:
+        _validate_entity(descendant, "Descendant")
+    result = orm.selectinload(parent) if _is_collection(parent) else orm.joinedload(parent)
     for descendant in descendants:
-        if not isinstance(descendant, orm.InstrumentedAttribute):
-            raise ValueError(f"Descendant must be an orm.InstrumentedAttribute, got: {type(descendant)}")
-    return orm.joinedload(parent).joinedload(*descendants)
+        result = result.selectinload(descendant) if _is_collection(descendant) else result.joinedload(descendant)
+    return result
 
 
 @contextlib.contextmanager
 def log_queries() -> Iterator[None]:
-    """A context manager to temporarily enable global query logging."""
-    global global_log_query
-    original_global_log_query_state = global_log_query
-    global_log_query = True
+    """A context manager to temporarily enable query logging in the current context."""
+    token = _LOG_QUERIES.set(True)
     try:
         yield
     finally:
-        global_log_query = original_global_log_query_state
+        _LOG_QUERIES.reset(token)
 
 
 # async def recent_tasks(data: Session, release_name: str, file_path: str, modified: int) -> dict[str, models.Task]:
@@ -942,29 +1051,52 @@ def log_queries() -> Iterator[None]:
 
 def select_in_load(*entities: Any) -> orm.strategy_options._AbstractLoad:
     """Eagerly load the given entities from the query."""
-    validated_entities = []
     for entity in entities:
-        if not isinstance(entity, orm.InstrumentedAttribute):
-            raise ValueError(f"Object must be an orm.InstrumentedAttribute, got: {type(entity)}")
-        validated_entities.append(entity)
-    return orm.selectinload(*validated_entities)
+        _validate_entity(entity, "Object")
+    return orm.selectinload(*entities)
 
 
 def select_in_load_nested(parent: Any, *descendants: Any) -> orm.strategy_options._AbstractLoad:
-    """Eagerly load the given nested entities from the query."""
-    if not isinstance(parent, orm.InstrumentedAttribute):
-        raise ValueError(f"Parent must be an orm.InstrumentedAttribute, got: {type(parent)}")
+    """
+    Eagerly load the given nested entities from the query.
+
+    Every level uses a separate SELECT ... IN query, so this suits collections at any depth.
+    """
+    _validate_entity(parent, "Parent")
     for descendant in descendants:
-        if not isinstance(descendant, orm.InstrumentedAttribute):
-            raise ValueError(f"Descendant must be an orm.InstrumentedAttribute, got: {type(descendant)}")
+        _validate_entity(descendant, "Descendant")
     result = orm.selectinload(parent)
     for descendant in descendants:
         result = result.selectinload(descendant)
     return result
 
 
-def session(log_queries: bool | None = None) -> Session:
-    """Create a new asynchronous database session."""
+async def request_session_close(
+    token: contextvars.Token[tuple[Session, asyncio.Task[Any] | None] | None],
+) -> None:
+    """Close the session opened by request_session_open and restore the previous current session."""
+    current = _CURRENT_SESSION.get()
+    _CURRENT_SESSION.reset(token)
+    if current is not None:
+        await current[0].close()
+
+
+def request_session_open() -> contextvars.Token[tuple[Session, asyncio.Task[Any] | None] | None]:
+    """
+    Open a read only session to be shared by read only ensure_session callers for the current request.
+
+    The session only checks out a connection when first used.
+    """
+    data = _sessionmaker(readonly=True)()
+    return _CURRENT_SESSION.set((data, asyncio.current_task()))
+
+
+def session(log_queries: bool | None = None, readonly: bool = False) -> Session:
+    """
+    Create a new asynchronous database session.
+
+    Read only sessions use a separate connection pool, and cannot write.
+    """
     # FIXME: occasionally you see this in the console output
     # <sys>:0: SAWarning: The garbage collector is trying to clean up non-checked-in connection <AdaptedConnection
     # <Connection(Thread-291, started daemon 138838634661440)>>, which will be dropped, as it cannot be safely
@@ -979,14 +1111,11 @@ def session(log_queries: bool | None = None) -> Session:
     # from FastAPI documentation:
     # https://fastapi-users.github.io/fastapi-users/latest/configuration/databases/sqlalchemy/
 
-    global _global_atr_sessionmaker
-    if _global_atr_sessionmaker is None:
-        raise RuntimeError("Call db.init_database or db.init_database_for_worker first, before calling db.session")
-
+    sessionmaker = _sessionmaker(readonly)
     if log_queries is not None:
-        session_instance = util.validate_as_type(_global_atr_sessionmaker(log_queries=log_queries), Session)
+        session_instance = util.validate_as_type(sessionmaker(log_queries=log_queries), Session)
     else:
-        session_instance = util.validate_as_type(_global_atr_sessionmaker(), Session)
+        session_instance = util.validate_as_type(sessionmaker(), Session)
     return session_instance
 
 
@@ -995,8 +1124,12 @@ def session_commit_function[**P, R](
 ) -> Callable[P, Awaitable[R]]:
     @functools.wraps(func)
     async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-        async with session() as data:
+        # Use the sessionmaker directly, as we need none of the options of session()
+        async with _sessionmaker(readonly=False)() as data:
             async with data.begin():
+                # Take the write lock at the start of the transaction
+                # A deferred transaction would have to upgrade its lock on the first write, which can fail when busy
+                await data.begin_immediate()
                 return await func(data, *args, **kwargs)
 
     return wrapper
@@ -1007,15 +1140,116 @@ def session_function[**P, R](
 ) -> Callable[P, Awaitable[R]]:
     @functools.wraps(func)
     async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-        async with session() as data:
+        async with _sessionmaker(readonly=True)() as data:
             return await func(data, *args, **kwargs)
 
     return wrapper
 
 
 async def shutdown_database() -> None:
+    if _global_optimize_task:
+        _global_optimize_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _global_optimize_task
+    if _global_atr_engine_readonly:
+        await _global_atr_engine_readonly.dispose()
     if _global_atr_engine:
         log.info("Closing database")
+        # SQLite recommends running PRAGMA optimize just before closing a connection
+        try:
+            await _optimize()
+        except Exception as e:
+            log.warning(f"Failed to optimize database before closing: {e}")
         await _global_atr_engine.dispose()
     else:
         log.info("No database to close")
+
+
+def _absolute_db_path(app_config: type[config.AppConfig]) -> str:
+    return os.path.join(app_config.STATE_DIR, app_config.SQLITE_DB_PATH)
+
+
+def _alembic_upgrade(alembic_cfg: alembic_config.Config, state_dir: str) -> None:
+    # It's okay to use synchronous code in this function, as it only runs at startup
+    # Only one process at a time may migrate
+    # Any others wait, and then find that the database is already at head
+    runtime_dir = os.path.join(state_dir, "runtime")
+    os.makedirs(runtime_dir, exist_ok=True)
+    lock_path = os.path.join(runtime_dir, "alembic.lock")
+
+    with open(lock_path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            command.upgrade(alembic_cfg, "head")
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+async def _create_engines(absolute_db_path: str) -> None:
+    global _global_atr_engine, _global_atr_engine_readonly
+    global _global_atr_sessionmaker, _global_atr_sessionmaker_readonly
+
+    # Create the read write engine first, as it creates the database and sets WAL mode
+    _global_atr_engine = await create_async_engine(absolute_db_path)
+    _global_atr_engine_readonly = await create_async_engine(absolute_db_path, readonly=True)
+
+    _global_atr_sessionmaker = sqlalchemy.ext.asyncio.async_sessionmaker(
+        bind=_global_atr_engine, class_=Session, expire_on_commit=False
+    )
+    _global_atr_sessionmaker_readonly = sqlalchemy.ext.asyncio.async_sessionmaker(
+        bind=_global_atr_engine_readonly, class_=Session, expire_on_commit=False
+    )
+
+
+def _is_collection(entity: orm.InstrumentedAttribute) -> bool:
+    prop = entity.property
+    return isinstance(prop, orm.RelationshipProperty) and (prop.uselist is True)
+
+
+def _current_session() -> Session | None:
+    current = _CURRENT_SESSION.get()
+    if current is None:
+        return None
+    data, task = current
+    # Tasks created during the request inherit its context
+    # But a session must not be used by more than one task at a time
+    if task is not asyncio.current_task():
+        return None
+    return data
+
+
+async def _optimize() -> None:
+    if _global_atr_engine is None:
+        return
+    async with _global_atr_engine.begin() as conn:
+        await conn.execute(sqlalchemy.text("PRAGMA optimize"))
+
+
+async def _optimize_periodically() -> None:
+    while True:
+        await asyncio.sleep(_OPTIMIZE_INTERVAL_SECONDS)
+        try:
+            await _optimize()
+        except Exception as e:
+            log.exception(f"Failed to optimize database: {e}")
+
+
+def _sessionmaker(readonly: bool) -> sqlalchemy.ext.asyncio.async_sessionmaker[Session]:
+    sessionmaker = _global_atr_sessionmaker_readonly if (readonly is True) else _global_atr_sessionmaker
+    if sessionmaker is None:
+        raise RuntimeError("Call db.init_database or db.init_database_for_worker first, before calling db.session")
+    return sessionmaker
+
+
+def _set_connection_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    # Run all of the pragmas as one script, in a single call to the aiosqlite thread
+    dbapi_connection.run_async(lambda connection: connection.executescript(_CONNECTION_PRAGMAS))
+
+
+def _validate_entity(entity: Any, description: str) -> None:
+    entity_id = id(entity)
+    if entity_id in _global_validated_entity_ids:
+        return
+    if not isinstance(entity, orm.InstrumentedAttribute):
+        raise ValueError(f"{description} must be an orm.InstrumentedAttribute, got: {type(entity)}")
+    _global_validated_entity_ids.add(entity_id)
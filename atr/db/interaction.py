@@ -18,6 +18,9 @@ import asyncio
 import contextlib
 import datetime
 import enum
+import functools
+import re
+import time
 from collections.abc import AsyncGenerator, Sequence
 from typing import Any, Final
 
@@ -26,6 +29,7 @@ import sqlalchemy
 import sqlalchemy.orm as orm
 import sqlmodel
 
+import atr.config as config
 import atr.db as db
 import atr.jwtoken as jwtoken
 import atr.ldap as ldap
@@ -36,7 +40,122 @@ import atr.user as user
 import atr.util as util
 import atr.web as web
 
+_AUTOMATED_RELEASE_SIGNING_COMMITTEES_TTL_S: Final[float] = 60.0
+_GITHUB_TO_APACHE_MAX_ENTRIES: Final[int] = 4096
+_GITHUB_TO_APACHE_TTL_S: Final[float] = 600.0
 _GITHUB_TRUSTED_ROLE_NID: Final[int] = 254436773
+_TRUSTED_PROJECT_TTL_S: Final[float] = 30.0
+_VERSION_SEPARATORS: Final = re.compile(r"[.+-]")
+_WAIT_FOR_TASK_INITIAL_DELAY_S: Final[float] = 0.05
+_WAIT_FOR_TASK_MAX_DELAY_S: Final[float] = 0.5
+
+# Frequently executed statements are built once, and their parameters are bound when they are executed
+_AUTOMATED_RELEASE_SIGNING_KEY_FILTER: Final = sqlalchemy.and_(
+    sqlalchemy.or_(
+        sql.validate_instrumented_attribute(sql.PublicSigningKey.primary_declared_uid).like(
+            "%Automated Release Signing%"
+        ),
+        sql.validate_instrumented_attribute(sql.PublicSigningKey.primary_declared_uid).like("%Services RM%"),
+    ),
+    sql.validate_instrumented_attribute(sql.PublicSigningKey.primary_declared_uid).like("%private@%.apache.org%"),
+)
+
+_AUTOMATED_RELEASE_SIGNING_COMMITTEES: Final = (
+    sqlmodel.select(sql.validate_instrumented_attribute(sql.KeyLink.committee_name))
+    .distinct()
+    .join(
+        sql.PublicSigningKey,
+        sql.validate_instrumented_attribute(sql.KeyLink.key_fingerprint)
+        == sql.validate_instrumented_attribute(sql.PublicSigningKey.fingerprint),
+    )
+    .where(_AUTOMATED_RELEASE_SIGNING_KEY_FILTER)
+)
+
+_AUTOMATED_RELEASE_SIGNING_KEYS: Final = sqlmodel.select(sql.PublicSigningKey).where(
+    _AUTOMATED_RELEASE_SIGNING_KEY_FILTER
+)
+
+_HAS_FAILING_CHECKS: Final = sqlmodel.select(
+    # EXISTS stops at the first failure instead of counting them all
+    sqlalchemy.exists().where(
+        sql.validate_instrumented_attribute(sql.CheckResult.release_name) == sqlalchemy.bindparam("release_name"),
+        sql.validate_instrumented_attribute(sql.CheckResult.revision_number) == sqlalchemy.bindparam("revision_number"),
+        sql.validate_instrumented_attribute(sql.CheckResult.status) == sql.CheckResultStatus.FAILURE,
+    )
+)
+
+# Projects are displayed by full name, falling back to the short name, as in Project.display_name
+_PROJECT_DISPLAY_ORDER: Final = sqlalchemy.func.coalesce(
+    sql.validate_instrumented_attribute(sql.Project.full_name), sql.validate_instrumented_attribute(sql.Project.name)
+)
+
+_RELEASE_LATEST_VOTE_TASK: Final = (
+    sqlmodel.select(sql.Task)
+    .where(sql.validate_instrumented_attribute(sql.Task.project_name) == sqlalchemy.bindparam("project_name"))
+    .where(sql.validate_instrumented_attribute(sql.Task.version_name) == sqlalchemy.bindparam("version_name"))
+    .where(sql.validate_instrumented_attribute(sql.Task.task_type) == sql.TaskType.VOTE_INITIATE)
+    .where(sql.validate_instrumented_attribute(sql.Task.status).in_(sqlalchemy.bindparam("statuses", expanding=True)))
+    .where(sql.validate_instrumented_attribute(sql.Task.result).is_not(None))
+    .order_by(sql.validate_instrumented_attribute(sql.Task.added).desc())
+    .limit(1)
+)
+
+_RELEASES_BY_PHASES: Final = (
+    sqlmodel.select(sql.Release)
+    .where(
+        sql.validate_instrumented_attribute(sql.Release.project_name) == sqlalchemy.bindparam("project_name"),
+        sql.validate_instrumented_attribute(sql.Release.phase).in_(sqlalchemy.bindparam("phases", expanding=True)),
+    )
+    .order_by(sql.validate_instrumented_attribute(sql.Release.created).desc())
+)
+
+_TASKS_ONGOING_SELECT: Final = (
+    sqlmodel.select(sqlalchemy.func.count())
+    .select_from(sql.Task)
+    .where(
+        sql.validate_instrumented_attribute(sql.Task.project_name) == sqlalchemy.bindparam("project_name"),
+        sql.validate_instrumented_attribute(sql.Task.version_name) == sqlalchemy.bindparam("version_name"),
+        sql.validate_instrumented_attribute(sql.Task.status).in_([sql.TaskStatus.QUEUED, sql.TaskStatus.ACTIVE]),
+    )
+)
+_TASKS_ONGOING: Final = _TASKS_ONGOING_SELECT.where(
+    sql.validate_instrumented_attribute(sql.Task.revision_number) == sqlalchemy.bindparam("revision_number")
+)
+_TASKS_ONGOING_LATEST_REVISION: Final = _TASKS_ONGOING_SELECT.where(
+    sql.validate_instrumented_attribute(sql.Task.revision_number) == sql.RELEASE_LATEST_REVISION_NUMBER
+)
+
+# The latest revision number is used twice, so it is materialised once in a CTE
+_LATEST_REVISION: Final = (
+    sqlalchemy.select(sql.validate_instrumented_attribute(sql.Revision.number))
+    .where(sql.validate_instrumented_attribute(sql.Revision.release_name) == sqlalchemy.bindparam("release_name"))
+    .order_by(sql.validate_instrumented_attribute(sql.Revision.seq).desc())
+    .limit(1)
+    .cte("latest_revision")
+    .prefix_with("MATERIALIZED")
+)
+_LATEST_REVISION_NUMBER: Final = sqlalchemy.select(_LATEST_REVISION.c.number).scalar_subquery()
+
+_TASKS_ONGOING_REVISION_SELECT: Final = (
+    sqlmodel.select(sqlalchemy.func.count().label("task_count"), _LATEST_REVISION_NUMBER.label("latest_revision"))
+    .select_from(sql.Task)
+    .where(
+        sql.validate_instrumented_attribute(sql.Task.project_name) == sqlalchemy.bindparam("project_name"),
+        sql.validate_instrumented_attribute(sql.Task.version_name) == sqlalchemy.bindparam("version_name"),
+        sql.validate_instrumented_attribute(sql.Task.status).in_([sql.TaskStatus.QUEUED, sql.TaskStatus.ACTIVE]),
+    )
+)
+_TASKS_ONGOING_REVISION: Final = _TASKS_ONGOING_REVISION_SELECT.where(
+    sql.validate_instrumented_attribute(sql.Task.revision_number) == sqlalchemy.bindparam("revision_number")
+)
+_TASKS_ONGOING_REVISION_LATEST: Final = _TASKS_ONGOING_REVISION_SELECT.where(
+    sql.validate_instrumented_attribute(sql.Task.revision_number) == _LATEST_REVISION_NUMBER
+)
+
+
+_global_automated_release_signing_committees: tuple[float, frozenset[str]] | None = None
+_global_github_to_apache: dict[int, tuple[float, str]] = {}
+_global_trusted_project_names: dict[tuple[str, str, "TrustedProjectPhase"], tuple[float, str]] = {}
 
 
 class ApacheUserMissingError(RuntimeError):
@@ -64,100 +183,64 @@ class TrustedProjectPhase(enum.Enum):
     FINISH = "finish"
 
 
-async def all_releases(project: sql.Project) -> list[sql.Release]:
+async def all_releases(project: sql.Project, caller_data: db.Session | None = None) -> list[sql.Release]:
     """Get all releases for the project, sorted by version."""
     query = sqlmodel.select(sql.Release).where(sql.Release.project_name == project.name)
 
-    results = []
-    async with db.session() as data:
-        for result in (await data.execute(query)).all():
-            release = result[0]
-            results.append(release)
+    async with db.ensure_session(caller_data, readonly=True) as data:
+        results = list((await data.execute(query)).scalars().all())
 
     for release in results:
-        release.project = project
+        # Set without change tracking, so the release is neither dirtied nor cascaded into the project's session
+        orm.attributes.set_committed_value(release, "project", project)
 
     try:
         # This rejects any non PEP 440 versions
-        results.sort(key=lambda r: version.Version(r.version), reverse=True)
+        results.sort(key=lambda r: _parse_version(r.version), reverse=True)
     except Exception as e:
         # Usually packaging.version.InvalidVersion
         if not isinstance(e, version.InvalidVersion):
             log.warning(f"Error sorting releases: {type(e)}: {e!s}")
-
-        def sort_key(release: sql.Release) -> tuple[tuple[int, int | str], ...]:
-            parts = []
-            v = release.version.replace("+", ".").replace("-", ".")
-            for part in v.split("."):
-                try:
-                    # Numeric parts: (0, number) to sort before strings
-                    parts.append((0, int(part)))
-                except ValueError:
-                    # String parts: (1, string) to sort after numbers
-                    parts.append((1, part))
-            return tuple(parts)
-
-        results.sort(key=sort_key, reverse=True)
+        results.sort(key=lambda r: _version_sort_key(r.version), reverse=True)
     return results
 
 
 async def automated_release_signing_committees(caller_data: db.Session | None = None) -> frozenset[str]:
     """Get all automated release signing committees."""
-    committees = []
-    async with db.ensure_session(caller_data) as data:
-        via = sql.validate_instrumented_attribute
-        query = (
-            sqlmodel.select(sql.PublicSigningKey)
-            .options(orm.selectinload(via(sql.PublicSigningKey.committees)))
-            .where(
-                sqlalchemy.and_(
-                    sqlalchemy.or_(
-                        via(sql.PublicSigningKey.primary_declared_uid).like("%Automated Release Signing%"),
-                        via(sql.PublicSigningKey.primary_declared_uid).like("%Services RM%"),
-                    ),
-                    via(sql.PublicSigningKey.primary_declared_uid).like("%private@%.apache.org%"),
-                )
-            )
-        )
-        result = await data.execute(query)
-        keys = result.scalars().all()
+    global _global_automated_release_signing_committees
+
+    # The signing keys change rarely, so the result is cached for a short time
+    cached = _global_automated_release_signing_committees
+    if (cached is not None) and ((time.monotonic() - cached[0]) < _AUTOMATED_RELEASE_SIGNING_COMMITTEES_TTL_S):
+        return cached[1]
 
-        for key in keys:
-            for committee in key.committees:
-                committees.append(committee.name)
+    async with db.ensure_session(caller_data, readonly=True) as data:
+        committees = set((await data.execute(_AUTOMATED_RELEASE_SIGNING_COMMITTEES)).scalars().all())
 
     # Committees allowed to make automated releases for testing
-    committees.append("test")
-    committees.append("tooling")
+    committees.add("test")
+    committees.add("tooling")
 
-    return frozenset(committees)
+    result = frozenset(committees)
+    _global_automated_release_signing_committees = (time.monotonic(), result)
+    return result
 
 
 async def automated_release_signing_keys(caller_data: db.Session | None = None) -> Sequence[sql.PublicSigningKey]:
     """Get all automated release signing keys."""
     async with db.ensure_session(caller_data) as data:
-        via = sql.validate_instrumented_attribute
-        query = sqlmodel.select(sql.PublicSigningKey).where(
-            sqlalchemy.and_(
-                sqlalchemy.or_(
-                    via(sql.PublicSigningKey.primary_declared_uid).like("%Automated Release Signing%"),
-                    via(sql.PublicSigningKey.primary_declared_uid).like("%Services RM%"),
-                ),
-                via(sql.PublicSigningKey.primary_declared_uid).like("%private@%.apache.org%"),
-            ),
-        )
-        result = await data.execute(query)
+        result = await data.execute(_AUTOMATED_RELEASE_SIGNING_KEYS)
         return result.scalars().all()
 
 
-async def candidate_drafts(project: sql.Project) -> list[sql.Release]:
+async def candidate_drafts(project: sql.Project, caller_data: db.Session | None = None) -> list[sql.Release]:
     """Get the candidate drafts for the project."""
-    return await releases_by_phase(project, sql.ReleasePhase.RELEASE_CANDIDATE_DRAFT)
+    return await releases_by_phase(project, sql.ReleasePhase.RELEASE_CANDIDATE_DRAFT, caller_data)
 
 
-async def candidates(project: sql.Project) -> list[sql.Release]:
+async def candidates(project: sql.Project, caller_data: db.Session | None = None) -> list[sql.Release]:
     """Get the candidate releases for the project."""
-    return await releases_by_phase(project, sql.ReleasePhase.RELEASE_CANDIDATE)
+    return await releases_by_phase(project, sql.ReleasePhase.RELEASE_CANDIDATE, caller_data)
 
 
 @contextlib.asynccontextmanager
@@ -167,73 +250,85 @@ async def ephemeral_gpg_home() -> AsyncGenerator[str]:
         yield str(temp_dir)
 
 
-async def full_releases(project: sql.Project) -> list[sql.Release]:
+async def full_releases(project: sql.Project, caller_data: db.Session | None = None) -> list[sql.Release]:
     """Get the full releases for the project."""
-    return await releases_by_phase(project, sql.ReleasePhase.RELEASE)
+    return await releases_by_phase(project, sql.ReleasePhase.RELEASE, caller_data)
 
 
 async def has_failing_checks(release: sql.Release, revision_number: str, caller_data: db.Session | None = None) -> bool:
-    async with db.ensure_session(caller_data) as data:
-        query = (
-            sqlmodel.select(sqlalchemy.func.count())
-            .select_from(sql.CheckResult)
-            .where(
-                sql.CheckResult.release_name == release.name,
-                sql.CheckResult.revision_number == revision_number,
-                sql.CheckResult.status == sql.CheckResultStatus.FAILURE,
-            )
-        )
-        result = await data.execute(query)
-        return result.scalar_one() > 0
+    params = {"release_name": release.name, "revision_number": revision_number}
+    async with db.ensure_session(caller_data, readonly=True) as data:
+        result = await data.execute(_HAS_FAILING_CHECKS, params)
+        return bool(result.scalar_one())
+
+
+def invalidate_automated_release_signing_committees() -> None:
+    """Discard the cached automated release signing committees after a key change."""
+    global _global_automated_release_signing_committees
+    _global_automated_release_signing_committees = None
+
+
+def invalidate_github_to_apache(github_numeric_uid: int | None = None) -> None:
+    """Discard one cached GitHub to ASF UID mapping, or all of them."""
+    if github_numeric_uid is None:
+        _global_github_to_apache.clear()
+    else:
+        _global_github_to_apache.pop(github_numeric_uid, None)
+
+
+def invalidate_trusted_projects() -> None:
+    """Discard the cached workflow to project resolutions after a release policy change."""
+    _global_trusted_project_names.clear()
 
 
-async def latest_info(project_name: str, version_name: str) -> tuple[str, str, datetime.datetime] | None:
+async def latest_info(
+    project_name: str, version_name: str, caller_data: db.Session | None = None
+) -> tuple[str, str, datetime.datetime] | None:
     """Get the name, editor, and timestamp of the latest revision."""
-    release_name = sql.release_name(project_name, version_name)
-    async with db.session() as data:
-        # TODO: No need to get release here
-        # Just use maximum seq from revisions
-        release = await data.release(name=release_name, _project=True).demand(
-            RuntimeError(f"Release {release_name} does not exist")
-        )
-        if release.latest_revision_number is None:
-            return None
-        revision = await data.revision(release_name=release_name, number=release.latest_revision_number).get()
-        if not revision:
-            return None
-    return revision.number, revision.asfuid, revision.created
+    via = sql.validate_instrumented_attribute
+    query = (
+        sqlmodel.select(via(sql.Revision.number), via(sql.Revision.asfuid), via(sql.Revision.created))
+        .where(via(sql.Revision.release_name) == sql.release_name(project_name, version_name))
+        .order_by(via(sql.Revision.seq).desc())
+        .limit(1)
+    )
+    async with db.ensure_session(caller_data, readonly=True) as data:
+        row = (await data.execute(query)).one_or_none()
+    if row is None:
+        return None
+    return row.number, row.asfuid, row.created
 
 
 async def latest_revision(release: sql.Release, caller_data: db.Session | None = None) -> sql.Revision | None:
     if release.latest_revision_number is None:
         return None
     async with db.ensure_session(caller_data) as data:
-        return await data.revision(release_name=release.name, number=release.latest_revision_number).get()
+        revision = await data.revision(release_name=release.name, number=release.latest_revision_number).get()
+    if revision is not None:
+        # Populate the relationship from the release we already have
+        # This avoids a lazy load, which would fail once the session is closed
+        orm.attributes.set_committed_value(revision, "release", release)
+    return revision
 
 
-async def previews(project: sql.Project) -> list[sql.Release]:
+async def previews(project: sql.Project, caller_data: db.Session | None = None) -> list[sql.Release]:
     """Get the preview releases for the project."""
-    return await releases_by_phase(project, sql.ReleasePhase.RELEASE_PREVIEW)
+    return await releases_by_phase(project, sql.ReleasePhase.RELEASE_PREVIEW, caller_data)
 
 
 async def release_latest_vote_task(release: sql.Release, caller_data: db.Session | None = None) -> sql.Task | None:
     """Find the most recent VOTE_INITIATE task for this release."""
-    disallowed_statuses = [sql.TaskStatus.QUEUED, sql.TaskStatus.ACTIVE]
+    # Only finished tasks count, except in development
+    statuses = [sql.TaskStatus.COMPLETED, sql.TaskStatus.FAILED]
     if util.is_dev_environment():
-        disallowed_statuses = []
-    via = sql.validate_instrumented_attribute
+        statuses = list(sql.TaskStatus)
+    params = {
+        "project_name": release.project_name,
+        "version_name": release.version,
+        "statuses": statuses,
+    }
     async with db.ensure_session(caller_data) as data:
-        query = (
-            sqlmodel.select(sql.Task)
-            .where(sql.Task.project_name == release.project_name)
-            .where(sql.Task.version_name == release.version)
-            .where(sql.Task.task_type == sql.TaskType.VOTE_INITIATE)
-            .where(via(sql.Task.status).notin_(disallowed_statuses))
-            .where(via(sql.Task.result).is_not(None))
-            .order_by(via(sql.Task.added).desc())
-            .limit(1)
-        )
-        task = (await data.execute(query)).scalar_one_or_none()
+        task = (await data.execute(_RELEASE_LATEST_VOTE_TASK, params)).scalar_one_or_none()
         return task
 
 
@@ -270,50 +365,60 @@ async def release_ready_for_vote(
     elif (not manual_vote) and release.project.policy_manual_vote:
         return "This release has manual vote mode enabled"
 
+    # The check results are in the database and the files are on disk, so look them up together
     if release.project.policy_strict_checking:
-        if await has_failing_checks(release, revision, caller_data=data):
-            return "This release candidate draft has errors. Please fix the errors before starting a vote."
+        failing_checks, has_files = await asyncio.gather(
+            has_failing_checks(release, revision, caller_data=data),
+            util.has_files(release),
+        )
+    else:
+        failing_checks, has_files = False, await util.has_files(release)
+
+    if failing_checks:
+        return "This release candidate draft has errors. Please fix the errors before starting a vote."
 
     if not (user.is_committee_member(committee, session.uid) or user.is_admin(session.uid)):
         return "You must be on the PMC of this project to start a vote"
 
-    has_files = await util.has_files(release)
     if not has_files:
         return "This release candidate draft has no files yet. Please add some files before starting a vote."
 
     return release, committee
 
 
-async def releases_by_phase(project: sql.Project, phase: sql.ReleasePhase) -> list[sql.Release]:
+async def releases_by_phase(
+    project: sql.Project, phase: sql.ReleasePhase, caller_data: db.Session | None = None
+) -> list[sql.Release]:
     """Get the releases for the project by phase."""
+    return await releases_by_phases(project, [phase], caller_data)
 
-    query = (
-        sqlmodel.select(sql.Release)
-        .where(
-            sql.Release.project_name == project.name,
-            sql.Release.phase == phase,
-        )
-        .order_by(sql.validate_instrumented_attribute(sql.Release.created).desc())
-    )
 
-    results = []
-    async with db.session() as data:
-        for result in (await data.execute(query)).all():
-            release = result[0]
-            results.append(release)
+async def releases_by_phases(
+    project: sql.Project, phases: Sequence[sql.ReleasePhase], caller_data: db.Session | None = None
+) -> list[sql.Release]:
+    """Get the releases for the project in any of the given phases, newest first."""
+    params = {"project_name": project.name, "phases": list(phases)}
+    async with db.ensure_session(caller_data, readonly=True) as data:
+        results = list((await data.execute(_RELEASES_BY_PHASES, params)).scalars().all())
 
     for release in results:
         # Don't need to eager load and lose it when the session closes
-        release.project = project
+        # Set without change tracking, so the release is neither dirtied nor cascaded into the project's session
+        orm.attributes.set_committed_value(release, "project", project)
     return results
 
 
-async def releases_in_progress(project: sql.Project) -> list[sql.Release]:
+async def releases_in_progress(project: sql.Project, caller_data: db.Session | None = None) -> list[sql.Release]:
     """Get the releases in progress for the project."""
-    drafts = await candidate_drafts(project)
-    cands = await candidates(project)
-    prevs = await previews(project)
-    return drafts + cands + prevs
+    in_progress_phases = [
+        sql.ReleasePhase.RELEASE_CANDIDATE_DRAFT,
+        sql.ReleasePhase.RELEASE_CANDIDATE,
+        sql.ReleasePhase.RELEASE_PREVIEW,
+    ]
+    releases = await releases_by_phases(project, in_progress_phases, caller_data)
+    # Keep drafts first, then candidates, then previews, each newest first
+    phase_order = {phase: index for index, phase in enumerate(in_progress_phases)}
+    return sorted(releases, key=lambda r: phase_order[r.phase])
 
 
 def task_mid_get(latest_vote_task: sql.Task) -> str | None:
@@ -336,17 +441,17 @@ def task_recipient_get(latest_vote_task: sql.Task) -> str | None:
     return result.email_to
 
 
-async def tasks_ongoing(project_name: str, version_name: str, revision_number: str | None = None) -> int:
-    tasks = sqlmodel.select(sqlalchemy.func.count()).select_from(sql.Task)
-    async with db.session() as data:
-        query = tasks.where(
-            sql.Task.project_name == project_name,
-            sql.Task.version_name == version_name,
-            sql.Task.revision_number
-            == (sql.RELEASE_LATEST_REVISION_NUMBER if (revision_number is None) else revision_number),
-            sql.validate_instrumented_attribute(sql.Task.status).in_([sql.TaskStatus.QUEUED, sql.TaskStatus.ACTIVE]),
-        )
-        result = await data.execute(query)
+async def tasks_ongoing(
+    project_name: str, version_name: str, revision_number: str | None = None, caller_data: db.Session | None = None
+) -> int:
+    params = {"project_name": project_name, "version_name": version_name}
+    if revision_number is None:
+        query = _TASKS_ONGOING_LATEST_REVISION
+    else:
+        query = _TASKS_ONGOING
+        params["revision_number"] = revision_number
+    async with db.ensure_session(caller_data, readonly=True) as data:
+        result = await data.execute(query, params)
         return result.scalar_one()
 
 
@@ -354,37 +459,20 @@ async def tasks_ongoing_revision(
     project_name: str,
     version_name: str,
     revision_number: str | None = None,
+    caller_data: db.Session | None = None,
 ) -> tuple[int, str | None]:
-    via = sql.validate_instrumented_attribute
-    subquery = (
-        sqlalchemy.select(via(sql.Revision.number))
-        .where(
-            via(sql.Revision.release_name) == sql.release_name(project_name, version_name),
-        )
-        .order_by(via(sql.Revision.seq).desc())
-        .limit(1)
-        .scalar_subquery()
-        .label("latest_revision")
-    )
-
-    query = (
-        sqlmodel.select(
-            sqlalchemy.func.count().label("task_count"),
-            subquery,
-        )
-        .select_from(sql.Task)
-        .where(
-            sql.Task.project_name == project_name,
-            sql.Task.version_name == version_name,
-            sql.Task.revision_number == (subquery if (revision_number is None) else revision_number),
-            sql.validate_instrumented_attribute(sql.Task.status).in_(
-                [sql.TaskStatus.QUEUED, sql.TaskStatus.ACTIVE],
-            ),
-        )
-    )
-
-    async with db.session() as session:
-        task_count, latest_revision = (await session.execute(query)).one()
+    params = {
+        "project_name": project_name,
+        "version_name": version_name,
+        "release_name": sql.release_name(project_name, version_name),
+    }
+    if revision_number is None:
+        query = _TASKS_ONGOING_REVISION_LATEST
+    else:
+        query = _TASKS_ONGOING_REVISION
+        params["revision_number"] = revision_number
+    async with db.ensure_session(caller_data, readonly=True) as data:
+        task_count, latest_revision = (await data.execute(query, params)).one()
         return task_count, latest_revision
 
 
@@ -419,63 +507,75 @@ async def trusted_jwt_for_dist(
     return payload, asf_uid, project, release
 
 
-async def unfinished_releases(asfuid: str) -> list[tuple[str, str, list[sql.Release]]]:
-    releases: list[tuple[str, str, list[sql.Release]]] = []
-    async with db.session() as data:
-        user_projects = await user.projects(asfuid)
-        user_projects.sort(key=lambda p: p.display_name)
-
-        active_phases = [
-            sql.ReleasePhase.RELEASE_CANDIDATE_DRAFT,
-            sql.ReleasePhase.RELEASE_CANDIDATE,
-            sql.ReleasePhase.RELEASE_PREVIEW,
-        ]
-        for project in user_projects:
-            stmt = (
-                sqlmodel.select(sql.Release)
-                .where(
-                    sql.Release.project_name == project.name,
-                    sql.validate_instrumented_attribute(sql.Release.phase).in_(active_phases),
-                )
-                .options(db.select_in_load(sql.Release.project))
-                .order_by(sql.validate_instrumented_attribute(sql.Release.created).desc())
-            )
-            result = await data.execute(stmt)
-            active_releases = list(result.scalars().all())
-            if active_releases:
-                active_releases.sort(key=lambda r: r.created, reverse=True)
-                releases.append((project.short_display_name, project.name, active_releases))
+async def unfinished_releases(
+    asfuid: str, caller_data: db.Session | None = None
+) -> list[tuple[str, str, list[sql.Release]]]:
+    active_phases = [
+        sql.ReleasePhase.RELEASE_CANDIDATE_DRAFT,
+        sql.ReleasePhase.RELEASE_CANDIDATE,
+        sql.ReleasePhase.RELEASE_PREVIEW,
+    ]
+    via = sql.validate_instrumented_attribute
+    stmt = (
+        sqlmodel.select(sql.Release)
+        .join(via(sql.Release.project))
+        .join(via(sql.Project.committee))
+        .where(_user_project(asfuid), via(sql.Release.phase).in_(active_phases))
+        .options(orm.contains_eager(via(sql.Release.project)).contains_eager(via(sql.Project.committee)))
+        .order_by(_PROJECT_DISPLAY_ORDER, via(sql.Release.project_name), via(sql.Release.created).desc())
+    )
+    # Rows arrive by project and then newest first, so both the projects and their lists are already in order
+    by_project: dict[str, list[sql.Release]] = {}
+    async with db.ensure_session(caller_data, readonly=True) as data:
+        for release in (await data.execute(stmt)).scalars():
+            by_project.setdefault(release.project_name, []).append(release)
 
-    return releases
+    return [
+        (active_releases[0].project.short_display_name, project_name, active_releases)
+        for project_name, active_releases in by_project.items()
+    ]
 
 
-async def user_committees(asf_uid: str) -> list[tuple[str, str]]:
-    results = []
-    for committee in await user_committees_participant(asf_uid):
-        results.append((committee.name, committee.full_name))
-    return results
+async def user_committees(asf_uid: str, caller_data: db.Session | None = None) -> list[tuple[str, str]]:
+    via = sql.validate_instrumented_attribute
+    # Match participants as user_committees_participant does
+    query = sqlmodel.select(via(sql.Committee.name), via(sql.Committee.full_name)).where(
+        via(sql.Committee.committee_members).contains(asf_uid) | via(sql.Committee.committers).contains(asf_uid)
+    )
+    async with db.ensure_session(caller_data, readonly=True) as data:
+        rows = (await data.execute(query)).all()
+    return [(row.name, row.full_name) for row in rows]
 
 
 # This function cannot go in user.py because it causes a circular import
 async def user_committees_committer(asf_uid: str, caller_data: db.Session | None = None) -> Sequence[sql.Committee]:
-    async with db.ensure_session(caller_data) as data:
+    async with db.ensure_session(caller_data, readonly=True) as data:
         return await data.committee(has_committer=asf_uid).all()
 
 
 # This function cannot go in user.py because it causes a circular import
 async def user_committees_member(asf_uid: str, caller_data: db.Session | None = None) -> Sequence[sql.Committee]:
-    async with db.ensure_session(caller_data) as data:
+    async with db.ensure_session(caller_data, readonly=True) as data:
         return await data.committee(has_member=asf_uid).all()
 
 
 # This function cannot go in user.py because it causes a circular import
 async def user_committees_participant(asf_uid: str, caller_data: db.Session | None = None) -> Sequence[sql.Committee]:
-    async with db.ensure_session(caller_data) as data:
+    async with db.ensure_session(caller_data, readonly=True) as data:
         return await data.committee(has_participant=asf_uid).all()
 
 
 async def user_projects(asf_uid: str, caller_data: db.Session | None = None) -> list[tuple[str, str]]:
-    projects = await user.projects(asf_uid)
+    via = sql.validate_instrumented_attribute
+    query = (
+        sqlmodel.select(sql.Project)
+        .join(via(sql.Project.committee))
+        .where(_user_project(asf_uid))
+        .options(orm.contains_eager(via(sql.Project.committee)))
+        .order_by(_PROJECT_DISPLAY_ORDER, via(sql.Project.name))
+    )
+    async with db.ensure_session(caller_data, readonly=True) as data:
+        projects = (await data.execute(query)).scalars().all()
     return [(p.name, p.display_name) for p in projects]
 
 
@@ -484,7 +584,7 @@ async def validate_trusted_jwt(publisher: str, jwt: str) -> tuple[dict[str, Any]
         raise InteractionError(f"Publisher {publisher} not supported")
     payload = await jwtoken.verify_github_oidc(jwt)
     if int(payload["actor_id"]) != _GITHUB_TRUSTED_ROLE_NID:
-        asf_uid = await ldap.github_to_apache(payload["actor_id"])
+        asf_uid = await _github_to_apache(int(payload["actor_id"]))
     else:
         asf_uid = None
     return payload, asf_uid
@@ -497,21 +597,59 @@ async def wait_for_task(
     timeout_s: int = 10,
 ) -> bool:
     # We must wait until the sbom_task is complete before we can queue checks
-    # Maximum wait time is 60 * 100ms = 6000ms
+    # Workers run in other processes, so we poll, backing off to keep the query rate low
     log.info(f"Waiting for task {task.id} to complete")
-    async with db.ensure_session(caller_data) as data:
-        t = await data.task(id=task.id).get()
-        if t is None:
+    via = sql.validate_instrumented_attribute
+    query = sqlmodel.select(via(sql.Task.status), via(sql.Task.error)).where(via(sql.Task.id) == task.id)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_s
+    delay = _WAIT_FOR_TASK_INITIAL_DELAY_S
+    while True:
+        # Only hold a connection while polling, not while sleeping
+        async with db.ensure_session(caller_data) as data:
+            row = (await data.execute(query)).one_or_none()
+        if row is None:
             return False
-        for _attempt in range(timeout_s * 10):
-            await data.refresh(t)
-            if t.status == sql.TaskStatus.FAILED:
-                raise InteractionError(f"Task {task.id} failed with error {t.error}")
-            if t.status == desired_status:
-                return True
-            # Wait 100ms before checking again
-            await asyncio.sleep(0.1)
-    return False
+        if row.status == sql.TaskStatus.FAILED:
+            raise InteractionError(f"Task {task.id} failed with error {row.error}")
+        if row.status == desired_status:
+            return True
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return False
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, _WAIT_FOR_TASK_MAX_DELAY_S)
+
+
+def _committee_participant(asf_uid: str) -> sqlalchemy.ColumnElement[bool]:
+    # Compare whole list elements, as user.projects does in Python
+    # So one user ID does not match another that contains it
+    via = sql.validate_instrumented_attribute
+    members = sqlalchemy.func.json_each(via(sql.Committee.committee_members)).table_valued("value")
+    committers = sqlalchemy.func.json_each(via(sql.Committee.committers)).table_valued("value")
+    return sqlalchemy.or_(
+        sqlalchemy.exists().where(members.c.value == asf_uid),
+        sqlalchemy.exists().where(committers.c.value == asf_uid),
+    )
+
+
+async def _github_to_apache(github_numeric_uid: int) -> str:
+    # CI runs for the same actor arrive in bursts, so cache the LDAP lookup for a while
+    # Failed lookups raise and are not cached
+    now = time.monotonic()
+    cached = _global_github_to_apache.get(github_numeric_uid)
+    if (cached is not None) and ((now - cached[0]) < _GITHUB_TO_APACHE_TTL_S):
+        return cached[1]
+    asf_uid = await ldap.github_to_apache(github_numeric_uid)
+    if len(_global_github_to_apache) >= _GITHUB_TO_APACHE_MAX_ENTRIES:
+        _global_github_to_apache.clear()
+    _global_github_to_apache[github_numeric_uid] = (now, asf_uid)
+    return asf_uid
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_version(version_str: str) -> version.Version:
+    return version.Version(version_str)
 
 
 async def _trusted_project(repository: str, workflow_ref: str, phase: TrustedProjectPhase) -> sql.Project:
@@ -519,33 +657,21 @@ async def _trusted_project(repository: str, workflow_ref: str, phase: TrustedPro
     log.info(f"GitHub OIDC JWT payload: {repository} {workflow_ref}")
     repository_name, workflow_path = _trusted_project_checks(repository, workflow_ref)
 
-    rpnf_error = ReleasePolicyNotFoundError(
-        f"Release policy for repository {repository_name} and {phase.value} workflow path {workflow_path} not found"
-    )
-    # TODO: If a policy is reused between projects, we can't get the project
+    # Policies change rarely, so remember which project a workflow resolves to for a short time
+    # The project itself is loaded fresh, so that callers never share an instance
+    key = (repository_name, workflow_path, phase)
+    now = time.monotonic()
+    cached = _global_trusted_project_names.get(key)
     async with db.session() as db_data:
-        match phase:
-            case TrustedProjectPhase.COMPOSE:
-                # Searches in github_*compose*_workflow_path
-                policy = await db_data.release_policy(
-                    github_repository_name=repository_name,
-                    github_compose_workflow_path_has=workflow_path,
-                ).demand(rpnf_error)
-            case TrustedProjectPhase.VOTE:
-                # Searches in github_*vote*_workflow_path
-                policy = await db_data.release_policy(
-                    github_repository_name=repository_name,
-                    github_vote_workflow_path_has=workflow_path,
-                ).demand(rpnf_error)
-            case TrustedProjectPhase.FINISH:
-                # Searches in github_*finish*_workflow_path
-                policy = await db_data.release_policy(
-                    github_repository_name=repository_name,
-                    github_finish_workflow_path_has=workflow_path,
-                ).demand(rpnf_error)
-        project = await db_data.project(release_policy_id=policy.id).demand(
-            InteractionError(f"Project for release policy {policy.id} not found")
-        )
+        project = None
+        if (cached is not None) and ((now - cached[0]) < _TRUSTED_PROJECT_TTL_S):
+            project = await db_data.project(name=cached[1]).get()
+        if project is None:
+            policy = await _trusted_project_policy(db_data, repository_name, workflow_path, phase)
+            project = await db_data.project(release_policy_id=policy.id).demand(
+                InteractionError(f"Project for release policy {policy.id} not found")
+            )
+            _global_trusted_project_names[key] = (now, project.name)
     if project.committee is None:
         raise InteractionError(f"Project {project.name} has no committee")
     github_automated_release_committees = await automated_release_signing_committees()
@@ -567,3 +693,49 @@ def _trusted_project_checks(repository: str, workflow_ref: str) -> tuple[str, st
     if not workflow_path.startswith(".github/workflows/"):
         raise InteractionError(f"Workflow path must start with '.github/workflows/', got {workflow_path}")
     return repository_name, workflow_path
+
+
+async def _trusted_project_policy(
+    db_data: db.Session, repository_name: str, workflow_path: str, phase: TrustedProjectPhase
+) -> sql.ReleasePolicy:
+    rpnf_error = ReleasePolicyNotFoundError(
+        f"Release policy for repository {repository_name} and {phase.value} workflow path {workflow_path} not found"
+    )
+    # TODO: If a policy is reused between projects, we can't get the project
+    match phase:
+        case TrustedProjectPhase.COMPOSE:
+            # Searches in github_*compose*_workflow_path
+            return await db_data.release_policy(
+                github_repository_name=repository_name,
+                github_compose_workflow_path_has=workflow_path,
+            ).demand(rpnf_error)
+        case TrustedProjectPhase.VOTE:
+            # Searches in github_*vote*_workflow_path
+            return await db_data.release_policy(
+                github_repository_name=repository_name,
+                github_vote_workflow_path_has=workflow_path,
+            ).demand(rpnf_error)
+        case TrustedProjectPhase.FINISH:
+            # Searches in github_*finish*_workflow_path
+            return await db_data.release_policy(
+                github_repository_name=repository_name,
+                github_finish_workflow_path_has=workflow_path,
+            ).demand(rpnf_error)
+
+
+def _user_project(asf_uid: str) -> sqlalchemy.ColumnElement[bool]:
+    # Matches active projects whose committee lists the user, as user.projects does
+    # The joined statement must include the Committee table
+    via = sql.validate_instrumented_attribute
+    participant = _committee_participant(asf_uid)
+    if config.get().ALLOW_TESTS:
+        # The test project shows in the user interface for everyone
+        participant = sqlalchemy.or_(participant, via(sql.Committee.name) == "test")
+    return sqlalchemy.and_(via(sql.Project.status) == sql.ProjectStatus.ACTIVE, participant)
+
+
+@functools.lru_cache(maxsize=4096)
+def _version_sort_key(version_str: str) -> tuple[tuple[int, int | str], ...]:
+    # Numeric parts: (0, number) to sort before strings
+    # String parts: (1, string) to sort after numbers
+    return tuple(((0, int(part)) if part.isdecimal() else (1, part)) for part in _VERSION_SEPARATORS.split(version_str))
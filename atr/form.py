@@ -17,13 +17,16 @@
 
 from __future__ import annotations
 
+import collections.abc
+import dataclasses
 import enum
+import functools
 import json
 import pathlib
 import re
 import types
 import unicodedata
-from typing import TYPE_CHECKING, Annotated, Any, Final, Literal, TypeAliasType, get_args, get_origin
+from typing import TYPE_CHECKING, Annotated, Any, Final, Literal, TypeAliasType, TypeGuard, get_args, get_origin
 
 import htpy
 import markupsafe
@@ -38,7 +41,7 @@ import atr.models.schema as schema
 import atr.util as util
 
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import Callable, Iterator, Mapping, Sequence
 
     import pydantic_core
 
@@ -47,7 +50,34 @@ if TYPE_CHECKING:
 DISCRIMINATOR_NAME: Final[str] = "variant"
 DISCRIMINATOR: Final[Any] = schema.discriminator(DISCRIMINATOR_NAME)
 
-_CONFIRM_PATTERN = re.compile(r"^[A-Za-z0-9 _.,!?-]+$")
+_CONFIRM_ALLOWED: Final[frozenset[str]] = frozenset(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 _.,!?-"
+)
+
+_EMPTY_POSIX_PATH: Final[pathlib.PurePosixPath] = pathlib.PurePosixPath()
+
+# This is the annotation of a FileList field once Pydantic has removed the Annotated metadata
+_FILE_LIST_ANNOTATIONS: Final[frozenset[Any]] = frozenset({list[datastructures.FileStorage]})
+
+_FILENAME_FORBIDDEN: Final[re.Pattern[str]] = re.compile(r"[\x00/\\]")
+
+_HTTP_URL_ADAPTER: Final[pydantic.TypeAdapter[pydantic.HttpUrl]] = pydantic.TypeAdapter(pydantic.HttpUrl)
+
+_MESSAGE_REWRITES: Final[dict[str, str]] = {
+    ": An email address": " because an email address",
+    "Value error, ": "",
+}
+
+_MESSAGE_REWRITE_PATTERN: Final[re.Pattern[str]] = re.compile("|".join(re.escape(k) for k in _MESSAGE_REWRITES))
+
+_NUMERIC_TYPES: Final[frozenset[type]] = frozenset({int, float})
+
+# Matches null bytes, backslashes, //, absolute POSIX and Windows paths, and .. components
+# PureWindowsPath treats any character followed by :/ as an absolute path with a drive
+# PurePosixPath removes . components, so they are allowed as before
+_RELPATH_INVALID: Final[re.Pattern[str]] = re.compile(r"\x00|\\|//|\A/|(?s:\A.:/)|(?:\A|/)\.\.(?:/|\Z)")
+
+_RELPATH_VALIDATION_CACHE_SIZE: Final[int] = 4096
 
 
 class Form(schema.Form):
@@ -74,15 +104,70 @@ class Widget(enum.Enum):
     URL = "url"
 
 
+# Widgets may be built from prerendered fragments as well as from elements
+type _WidgetElement = htm.Element | htm.VoidElement | markupsafe.Markup
+
+_WIDGET_BY_VALUE: Final[dict[str, Widget]] = {w.value: w for w in Widget}
+
+_CHECK_WIDGETS: Final[frozenset[Widget]] = frozenset({Widget.CHECKBOX, Widget.RADIO, Widget.CHECKBOXES})
+
+_COMPOUND_WIDGETS: Final[frozenset[Widget]] = frozenset({Widget.CHECKBOXES, Widget.FILES})
+
+_WIDGET_CLASSES: Final[dict[Widget, str]] = {
+    w: ("form-check-input" if (w in _CHECK_WIDGETS) else ("form-select" if (w == Widget.SELECT) else "form-control"))
+    for w in Widget
+}
+
+# Check widgets do not show their errors using is-invalid
+_WIDGET_CLASSES_WITH_ERRORS: Final[dict[Widget, str]] = {
+    w: (classes if (w in _CHECK_WIDGETS) else f"{classes} is-invalid") for w, classes in _WIDGET_CLASSES.items()
+}
+
+# Label classes, indexed by whether the widgets are wider and whether the field has a flash error
+_LABEL_CLASSES: Final[dict[tuple[bool, bool], str]] = {
+    (False, False): "col-sm-3 col-form-label text-sm-end",
+    (False, True): "col-sm-3 col-form-label text-sm-end text-danger",
+    (True, False): "col-sm-2 col-form-label text-sm-end",
+    (True, True): "col-sm-2 col-form-label text-sm-end text-danger",
+}
+
+# Row classes, indexed by whether the rows have a border
+_ROW_CLASSES: Final[dict[bool, str]] = {False: ".mb-3.pb-3.row", True: ".mb-3.pb-3.row.border-bottom"}
+
+# Submit column classes, indexed by whether the widgets are wider
+_SUBMIT_COLUMN_CLASSES: Final[dict[bool, str]] = {False: ".col-sm-9.offset-sm-3", True: ".col-sm-10.offset-sm-2"}
+
+# Widget column classes, indexed by whether the widgets are wider
+_WIDGET_COLUMN_CLASSES: Final[dict[bool, str]] = {False: ".col-sm-8", True: ".col-sm-9"}
+
+
+@dataclasses.dataclass(frozen=True)
+class _FieldPlan:
+    name: str
+    info: pydantic.fields.FieldInfo
+    widget_type: Widget
+    choices: tuple[tuple[str, str], ...]
+    label_text: str
+    is_required: bool
+    documentation: str | None
+    discriminator_input: htm.VoidElement | None
+
+
 def csrf_input() -> htm.VoidElement:
+    # The token is the same for the whole request, so we build the input once
+    cached: htm.VoidElement | None = quart.g.get("csrf_input")
+    if cached is not None:
+        return cached
     csrf_token = utils.generate_csrf()
-    return htpy.input(type="hidden", name="csrf_token", value=csrf_token)
+    element = htpy.input(type="hidden", name="csrf_token", value=csrf_token)
+    quart.g.csrf_input = element
+    return element
 
 
 def flash_error_data(
     form_cls: type[Form] | TypeAliasType, errors: list[pydantic_core.ErrorDetails], form_data: dict[str, Any]
 ) -> dict[str, Any]:
-    flash_data = {}
+    flash_items: list[tuple[str, dict[str, Any]]] = []
     error_field_names = set()
 
     # It is not valid Python syntax to use type[Form]() in a match branch
@@ -93,31 +178,38 @@ def flash_error_data(
         #     discriminator_value = _discriminator_from_errors(errors)
         discriminator_value = _discriminator_from_errors(errors)
         concrete_cls = _get_concrete_cls(form_cls, discriminator_value)
+        strip_discriminator = True
     else:
         concrete_cls = form_cls
+        strip_discriminator = False
 
     for i, error in enumerate(errors):
         loc = error["loc"]
         kind = error["type"]
         msg = error["msg"]
-        msg = msg.replace(": An email address", " because an email address")
-        msg = msg.replace("Value error, ", "")
+        msg = _MESSAGE_REWRITE_PATTERN.sub(_message_rewrite, msg)
         original = error["input"]
-        field_name, field_label = name_and_label(concrete_cls, i, loc)
-        flash_data[field_name] = {
-            "label": field_label,
-            "original": json_suitable(original),
-            "kind": kind,
-            "msg": msg,
-        }
+        field_name, field_label = name_and_label(concrete_cls, i, loc, strip_discriminator=strip_discriminator)
+        flash_items.append(
+            (
+                field_name,
+                {
+                    "label": field_label,
+                    "original": json_suitable(original),
+                    "kind": kind,
+                    "msg": msg,
+                },
+            )
+        )
         error_field_names.add(field_name)
 
     for field_name, field_value in form_data.items():
         if (field_name not in error_field_names) and (field_name != "csrf_token"):
-            flash_data[f"!{field_name}"] = {
-                "original": json_suitable(field_value),
-            }
-    return flash_data
+            flash_items.append((f"!{field_name}", {"original": json_suitable(field_value)}))
+
+    # Build the dictionary in one step rather than growing it one key at a time
+    # As with assignment, a repeated field name keeps its first position and its last value
+    return dict(flash_items)
 
 
 def flash_error_summary(errors: list[pydantic_core.ErrorDetails], flash_data: dict[str, Any]) -> markupsafe.Markup:
@@ -142,10 +234,12 @@ def json_suitable(field_value: Any) -> Any:
     if isinstance(field_value, datastructures.FileStorage):
         return field_value.filename
     elif isinstance(field_value, list):
-        if all(isinstance(f, datastructures.FileStorage) for f in field_value):
-            return [f.filename for f in field_value]
-        else:
-            return field_value
+        filenames = []
+        for f in field_value:
+            if not isinstance(f, datastructures.FileStorage):
+                return field_value
+            filenames.append(f.filename)
+        return filenames
     return field_value
 
 
@@ -160,16 +254,16 @@ def label(
     return pydantic.Field(default, description=description, json_schema_extra=extra)
 
 
-def name_and_label(form_cls: type[Form], i: int, loc: tuple[str | int, ...]) -> tuple[str, str]:
-    if loc:
-        field_name = loc[0]
+def name_and_label(
+    form_cls: type[Form], i: int, loc: tuple[str | int, ...], strip_discriminator: bool = False
+) -> tuple[str, str]:
+    # Errors from a discriminated union start with the discriminator value
+    # We skip over it by index rather than slicing a new tuple
+    start = 1 if (strip_discriminator and loc and isinstance(loc[0], str)) else 0
+    if len(loc) > start:
+        field_name = loc[start]
         if isinstance(field_name, str):
-            field_info = form_cls.model_fields.get(field_name)
-            if field_info and field_info.description:
-                field_label = field_info.description
-            else:
-                field_label = field_name.replace("_", " ").title()
-            return field_name, field_label
+            return field_name, _field_label(form_cls, field_name)
     # Might be a model validation error
     field_name = f".{i}"
     field_label = "*"
@@ -180,43 +274,42 @@ async def quart_request() -> dict[str, Any]:
     form_data = await quart.request.form
     files_data = await quart.request.files
 
-    combined_data = {}
-    for key in form_data.keys():
+    combined_data: dict[str, Any] = {}
+    for key, values in form_data.lists():
         # This is a compromise
         # Some things expect single values, and some expect lists
-        values = form_data.getlist(key)
         if len(values) == 1:
             combined_data[key] = values[0]
         else:
             combined_data[key] = values
 
-    files_by_name: dict[str, list[datastructures.FileStorage]] = {}
-    for key in files_data.keys():
-        file_list = files_data.getlist(key)
+    for key, file_list in files_data.lists():
         # When no files are uploaded, the browser may supply a file with an empty filename
         # We filter that out here
         non_empty_files = [f for f in file_list if f.filename]
-        if non_empty_files:
-            files_by_name[key] = non_empty_files
-
-    for key, file_list in files_by_name.items():
+        if not non_empty_files:
+            continue
         if key in combined_data:
             raise ValueError(f"Files key {key} already exists in form data")
-        combined_data[key] = file_list
+        combined_data[key] = non_empty_files
 
     return combined_data
 
 
+@functools.cache
+def _base_attrs(field_name: str, widget_classes: str) -> Mapping[str, str]:
+    # These attributes are the same for a field on every render, so they are shared
+    # The proxy stops any widget builder from modifying the shared attributes
+    return types.MappingProxyType({"name": field_name, "id": field_name, "class_": widget_classes})
+
+
 def _discriminator_from_errors(errors: list[pydantic_core.ErrorDetails]) -> str:
-    discriminator_value = None
+    # This must not modify the errors, so that flash_error_data can be called more than once
     for error in errors:
         loc = error["loc"]
         if loc and isinstance(loc[0], str):
-            discriminator_value = loc[0]
-            error["loc"] = loc[1:]
-    if discriminator_value is None:
-        raise ValueError("Discriminator not found")
-    return discriminator_value
+            return loc[0]
+    raise ValueError("Discriminator not found")
 
 
 def _get_concrete_cls(form_cls: TypeAliasType, discriminator_value: str) -> type[Form]:
@@ -234,15 +327,21 @@ def _get_concrete_cls(form_cls: TypeAliasType, discriminator_value: str) -> type
 
 
 def _get_flash_error_data() -> dict[str, Any]:
+    # Pages with more than one form would otherwise parse the same data for each form
+    cached: dict[str, Any] | None = quart.g.get("form_error_data")
+    if cached is not None:
+        return cached
+    error_data: dict[str, Any] = {}
     flashed_error_messages = quart.get_flashed_messages(category_filter=["form-error-data"])
     if flashed_error_messages:
         try:
             first_message = flashed_error_messages[0]
             if isinstance(first_message, str):
-                return json.loads(first_message)
+                error_data = json.loads(first_message)
         except (json.JSONDecodeError, IndexError):
             pass
-    return {}
+    quart.g.form_error_data = error_data
+    return error_data
 
 
 def render(  # noqa: C901
@@ -279,17 +378,15 @@ def render(  # noqa: C901
     field_rows: list[htm.Element] = []
     hidden_fields: list[htm.Element | htm.VoidElement | markupsafe.Markup] = []
     hidden_fields.append(csrf_input())
-    skip_fields = set(skip) if skip else set()
-
-    for field_name, field_info in model_cls.model_fields.items():
-        if field_name == "csrf_token":
-            continue
-        if field_name in skip_fields:
-            continue
+    # The render plan already leaves out csrf_token
+    plans = _render_plan(model_cls)
+    if skip:
+        skip_fields = set(skip)
+        plans = tuple(plan for plan in plans if (plan.name not in skip_fields))
 
+    for plan in plans:
         hidden_field, row = _render_row(
-            field_info,
-            field_name,
+            plan,
             flash_error_data,
             defaults,
             errors,
@@ -314,10 +411,7 @@ def render(  # noqa: C901
     if is_empty_form:
         form_children.extend(submit_div_contents)
     else:
-        if wider_widgets:
-            submit_div = htm.div(".col-sm-10.offset-sm-2")
-        else:
-            submit_div = htm.div(".col-sm-9.offset-sm-3")
+        submit_div = htm.div(_SUBMIT_COLUMN_CLASSES[wider_widgets])
         submit_row = htm.div(".row")[submit_div[submit_div_contents]]
         form_children.append(submit_row)
 
@@ -331,9 +425,10 @@ def render(  # noqa: C901
         "enctype": "multipart/form-data",
     }
     if confirm:
-        if not _CONFIRM_PATTERN.match(confirm):
+        if not _CONFIRM_ALLOWED.issuperset(confirm):
             raise ValueError(f"Invalid characters in confirm message: {confirm!r}")
-        form_attrs["onsubmit"] = f"return confirm('{confirm}');"
+        # Encode as a JavaScript string literal in case the allowed characters are ever widened
+        form_attrs["onsubmit"] = f"return confirm({json.dumps(confirm)});"
 
     return htm.form(form_classes, **form_attrs)[form_children]
 
@@ -357,7 +452,7 @@ def to_bool(v: Any) -> bool:
 
 
 def to_enum[EnumType: enum.Enum](v: Any, enum_class: type[EnumType]) -> EnumType:
-    members: dict[str, EnumType] = {member.value: member for member in enum_class}
+    members: dict[str, EnumType] = _enum_members(enum_class)
     if isinstance(v, enum_class):
         return v
     if isinstance(v, str):
@@ -368,7 +463,7 @@ def to_enum[EnumType: enum.Enum](v: Any, enum_class: type[EnumType]) -> EnumType
 
 
 def to_enum_set[EnumType: enum.Enum](v: Any, enum_class: type[EnumType]) -> set[EnumType]:
-    members: dict[str, EnumType] = {member.value: member for member in enum_class}
+    members: dict[str, EnumType] = _enum_members(enum_class)
     if isinstance(v, set):
         return {item for item in v if isinstance(item, enum_class)}
     if isinstance(v, list):
@@ -423,14 +518,15 @@ def to_filename(v: Any) -> pathlib.Path | None:
     if not name:
         raise ValueError("Filename cannot be empty")
 
-    if "\0" in name:
-        raise ValueError("Filename cannot contain null bytes")
+    # NFC normalisation can neither add nor remove these characters
+    # Therefore we check for them all in one scan before normalising
+    if _FILENAME_FORBIDDEN.search(name):
+        if "\0" in name:
+            raise ValueError("Filename cannot contain null bytes")
+        raise ValueError("Filename cannot contain path separators")
 
     name = unicodedata.normalize("NFC", name)
 
-    if ("/" in name) or ("\\" in name):
-        raise ValueError("Filename cannot contain path separators")
-
     if name in (".", ".."):
         raise ValueError("Invalid filename")
 
@@ -449,7 +545,7 @@ def to_int(v: Any) -> int:
 def to_optional_url(v: Any) -> pydantic.HttpUrl | None:
     if (v is None) or (v == ""):
         return None
-    return pydantic.TypeAdapter(pydantic.HttpUrl).validate_python(v)
+    return _HTTP_URL_ADAPTER.validate_python(v)
 
 
 def to_relpath(v: Any) -> pathlib.Path | None:
@@ -523,15 +619,11 @@ class Enum[EnumType: enum.Enum]:
 
     @staticmethod
     def __class_getitem__(enum_class: type[EnumType]):
-        def validator(v: Any) -> EnumType:
-            return to_enum(v, enum_class)
-
-        # Get the first enum member as the default
-        first_member = next(iter(enum_class))
+        # The first enum member is the default
         return Annotated[
             enum_class,
-            functional_validators.BeforeValidator(validator),
-            pydantic.Field(default=first_member),
+            functional_validators.BeforeValidator(_enum_validator(enum_class)),
+            pydantic.Field(default=_enum_first_member(enum_class)),
         ]
 
 
@@ -596,12 +688,9 @@ class Set[EnumType: enum.Enum]:
 
     @staticmethod
     def __class_getitem__(enum_class: type[EnumType]):
-        def validator(v: Any) -> set[EnumType]:
-            return to_enum_set(v, enum_class)
-
         return Annotated[
             set[enum_class],
-            functional_validators.BeforeValidator(validator),
+            functional_validators.BeforeValidator(_enum_set_validator(enum_class)),
             pydantic.Field(default_factory=set),
         ]
 
@@ -611,7 +700,7 @@ URL = pydantic.HttpUrl
 
 def validate(model_cls: Any, form: dict[str, Any], context: dict[str, Any] | None = None) -> pydantic.BaseModel:
     # Since pydantic.TypeAdapter accepts Any, we do the same
-    return pydantic.TypeAdapter(model_cls).validate_python(form, context=context)
+    return _type_adapter(model_cls).validate_python(form, context=context)
 
 
 def value(type_alias: Any) -> Any:
@@ -628,83 +717,128 @@ def widget(widget_type: Widget) -> Any:
     return pydantic.Field(..., json_schema_extra={"widget": widget_type.value})
 
 
-def _get_choices(field_info: pydantic.fields.FieldInfo) -> list[tuple[str, str]]:  # noqa: C901
+def _choice_html(
+    input_type: str, field_name: str, val: str, label: str, is_required: bool, checked: bool
+) -> markupsafe.Markup:
+    # Choices are formatted directly, which produces the same HTML as htpy without building elements
+    choice_id = markupsafe.escape(f"{field_name}_{val}")
+    required_attr = ' required=""' if is_required else ""
+    checked_attr = ' checked=""' if checked else ""
+    return markupsafe.Markup(
+        f'<div class="form-check"><input type="{input_type}" name="{markupsafe.escape(field_name)}"'
+        f' id="{choice_id}" value="{markupsafe.escape(val)}" class="form-check-input"{required_attr}{checked_attr}>'
+        f'<label for="{choice_id}" class="form-check-label">{markupsafe.escape(label)}</label></div>'
+    )
+
+
+@functools.cache
+def _choice_fragments(
+    input_type: str, field_name: str, choices: tuple[tuple[str, str], ...], is_required: bool
+) -> tuple[tuple[str, markupsafe.Markup, markupsafe.Markup], ...]:
+    # Returns the value, the unchecked HTML, and the checked HTML of each choice
+    fragments = []
+    for val, label in choices:
+        unchecked = _choice_html(input_type, field_name, val, label, is_required, False)
+        checked = _choice_html(input_type, field_name, val, label, is_required, True)
+        fragments.append((val, unchecked, checked))
+    return tuple(fragments)
+
+
+@functools.cache
+def _declared_field_label(form_cls: type[Form], field_name: str) -> str:
+    field_info = form_cls.model_fields[field_name]
+    if field_info.description:
+        return field_info.description
+    return field_name.replace("_", " ").title()
+
+
+@functools.cache
+def _enum_first_member[EnumType: enum.Enum](enum_class: type[EnumType]) -> EnumType:
+    return next(iter(enum_class))
+
+
+@functools.cache
+def _enum_members[EnumType: enum.Enum](enum_class: type[EnumType]) -> dict[str, EnumType]:
+    # Callers must not modify the returned dictionary, because it is shared
+    return {member.value: member for member in enum_class}
+
+
+# Equivalent Enum[T] and Set[T] annotations share the same validator objects
+@functools.cache
+def _enum_set_validator[EnumType: enum.Enum](enum_class: type[EnumType]) -> functools.partial[set[EnumType]]:
+    return functools.partial(to_enum_set, enum_class=enum_class)
+
+
+@functools.cache
+def _enum_validator[EnumType: enum.Enum](enum_class: type[EnumType]) -> functools.partial[EnumType]:
+    return functools.partial(to_enum, enum_class=enum_class)
+
+
+def _field_label(form_cls: type[Form], field_name: str) -> str:
+    # Undeclared names come from the client, so only declared fields are cached
+    if field_name in form_cls.model_fields:
+        return _declared_field_label(form_cls, field_name)
+    return field_name.replace("_", " ").title()
+
+
+# FieldInfo objects hash by identity, and the fields of a model never change
+# Therefore we can cache these per FieldInfo for the lifetime of the process
+@functools.cache
+def _get_choices(field_info: pydantic.fields.FieldInfo) -> tuple[tuple[str, str], ...]:  # noqa: C901
     annotation = field_info.annotation
     origin = get_origin(annotation)
 
     if origin is Literal:
-        return [(v, v) for v in get_args(annotation)]
+        return tuple((v, v) for v in get_args(annotation))
 
     if origin is Annotated:
         # Check whether this is an Enum[T] or Set[T] annotation
         args = get_args(annotation)
         if args:
             inner_type = args[0]
-            if isinstance(inner_type, type) and issubclass(inner_type, enum.Enum):
+            if _is_enum_class(inner_type):
                 # This is an enum type wrapped in Annotated, from Enum[T] or Set[T]
-                return [(member.value, member.value) for member in inner_type]
+                return tuple((member.value, member.value) for member in inner_type)
 
     if origin is set:
         args = get_args(annotation)
         if args:
             enum_class = args[0]
-            if isinstance(enum_class, type) and issubclass(enum_class, enum.Enum):
-                return [(member.value, member.value) for member in enum_class]
+            if _is_enum_class(enum_class):
+                return tuple((member.value, member.value) for member in enum_class)
 
     if origin is list:
         args = get_args(annotation)
         if args and (get_origin(args[0]) is Literal):
-            return [(v, v) for v in get_args(args[0])]
+            return tuple((v, v) for v in get_args(args[0]))
 
     # Check for plain enum types, e.g. when Pydantic unwraps form.Enum[T]
-    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
-        return [(member.value, member.value) for member in annotation]
+    if _is_enum_class(annotation):
+        return tuple((member.value, member.value) for member in annotation)
 
-    return []
+    return ()
 
 
 def _get_widget_classes(widget_type: Widget, has_errors: list[str] | None) -> str:
-    match widget_type:
-        case Widget.SELECT:
-            base_class = "form-select"
-        case Widget.CHECKBOX | Widget.RADIO | Widget.CHECKBOXES:
-            return "form-check-input"
-        case _:
-            base_class = "form-control"
-
     if has_errors:
-        return f"{base_class} is-invalid"
-    return base_class
+        return _WIDGET_CLASSES_WITH_ERRORS[widget_type]
+    return _WIDGET_CLASSES[widget_type]
 
 
+@functools.cache
 def _get_widget_type(field_info: pydantic.fields.FieldInfo) -> Widget:  # noqa: C901
     json_schema_extra = field_info.json_schema_extra or {}
     if isinstance(json_schema_extra, dict) and ("widget" in json_schema_extra):
         widget_value = json_schema_extra["widget"]
         if isinstance(widget_value, str):
-            try:
-                return Widget(widget_value)
-            except ValueError:
-                pass
-
-    annotation = field_info.annotation
-    origin = get_origin(annotation)
+            widget_by_value = _WIDGET_BY_VALUE.get(widget_value)
+            if widget_by_value is not None:
+                return widget_by_value
 
-    if (annotation is not None) and hasattr(annotation, "__value__"):
-        annotation = annotation.__value__
-        origin = get_origin(annotation)
+    annotation, origin = _unwrap_annotation(field_info.annotation)
 
-    if isinstance(annotation, types.UnionType) or (origin is type(None)):
-        args = get_args(annotation)
-        non_none_types = [arg for arg in args if (arg is not type(None))]
-        if non_none_types:
-            annotation = non_none_types[0]
-            origin = get_origin(annotation)
-
-    if origin is Annotated:
-        args = get_args(annotation)
-        annotation = args[0]
-        origin = get_origin(annotation)
+    if annotation in _FILE_LIST_ANNOTATIONS:
+        return Widget.FILES
 
     if annotation is datastructures.FileStorage:
         return Widget.FILE
@@ -718,7 +852,7 @@ def _get_widget_type(field_info: pydantic.fields.FieldInfo) -> Widget:  # noqa:
     if annotation is pydantic.HttpUrl:
         return Widget.URL
 
-    if annotation in (int, float):
+    if annotation in _NUMERIC_TYPES:
         return Widget.NUMBER
 
     if origin is Literal:
@@ -734,7 +868,7 @@ def _get_widget_type(field_info: pydantic.fields.FieldInfo) -> Widget:  # noqa:
         args = get_args(annotation)
         if args:
             first_arg = args[0]
-            if isinstance(first_arg, type) and issubclass(first_arg, enum.Enum):
+            if _is_enum_class(first_arg):
                 return Widget.CHECKBOXES
 
     if origin is list:
@@ -761,6 +895,20 @@ def _get_widget_type(field_info: pydantic.fields.FieldInfo) -> Widget:  # noqa:
     return Widget.TEXT
 
 
+def _is_enum_class(annotation: Any) -> TypeGuard[type[enum.Enum]]:
+    return isinstance(annotation, type) and issubclass(annotation, enum.Enum)
+
+
+def _message_rewrite(match: re.Match[str]) -> str:
+    return _MESSAGE_REWRITES[match.group(0)]
+
+
+@functools.cache
+def _missing_custom_widget(field_name: str) -> htm.Element:
+    # Elements are not modified after construction, so the placeholder can be shared
+    return htm.div[f"Custom widget for {field_name} not provided"]
+
+
 def _parse_dynamic_choices(
     field_name: str, defaults: dict[str, Any] | None, field_value: Any
 ) -> tuple[list[tuple[str, str]], Any]:
@@ -797,12 +945,50 @@ def _parse_dynamic_choices(
     return [], field_value
 
 
+def _relpath_error_message(path_str: str) -> str:
+    # The checks are made in order of precedence, so paths with several problems get the first message
+    if "\0" in path_str:
+        return "Path cannot contain null bytes"
+    if "\\" in path_str:
+        return "Path cannot contain backslashes"
+    # PurePosixPath normalises empty components
+    # Therefore, we must check for // on the path string
+    if "//" in path_str:
+        return "Path cannot contain //"
+
+    # Check for absolute paths using both POSIX and Windows semantics
+    # We don't support Windows paths, but we want to detect all bad inputs
+    # Without backslashes or //, a Windows path is only absolute with a drive, i.e. any character then :/
+    if path_str.startswith("/") or (path_str[1:3] == ":/"):
+        return "Absolute paths are not allowed"
+
+    # Every remaining rejection is for a .. component, so only split when .. occurs at all
+    if (".." in path_str) and (".." in path_str.split("/")):
+        return "Parent directory references (..) are not allowed"
+    raise RuntimeError(f"Path {path_str!r} was rejected for no known reason")
+
+
+@functools.lru_cache(maxsize=_RELPATH_VALIDATION_CACHE_SIZE)
+def _relpath_validation(path_str: str) -> tuple[pathlib.PurePosixPath, str | None]:
+    # The same paths are validated again and again across requests
+    # This is pure, so we cache rejections as well as acceptances
+    # NFC normalisation neither adds nor removes null bytes, backslashes, or slashes
+    # But it can turn a drive letter with a combining character into a single character
+    # Therefore we normalise before the scan
+    path_str = unicodedata.normalize("NFC", path_str)
+    # One scan accepts almost every path
+    # Only when it finds a problem do we work out which message to give
+    if _RELPATH_INVALID.search(path_str):
+        return _EMPTY_POSIX_PATH, _relpath_error_message(path_str)
+    return pathlib.PurePosixPath(path_str), None
+
+
 def _render_field_value(
     field_name: str,
     flash_error_data: dict[str, Any],
     has_flash_error: bool,
     defaults: dict[str, Any] | None,
-    field_info: pydantic.fields.FieldInfo,
+    plan: _FieldPlan,
 ) -> Any:
     has_flash_data = f"!{field_name}" in flash_error_data
     if has_flash_error:
@@ -811,16 +997,51 @@ def _render_field_value(
         field_value = flash_error_data[f"!{field_name}"]["original"]
     elif defaults:
         field_value = defaults.get(field_name)
-    elif not field_info.is_required():
-        field_value = field_info.get_default(call_default_factory=True)
+    elif not plan.is_required:
+        field_value = plan.info.get_default(call_default_factory=True)
     else:
         field_value = None
     return field_value
 
 
-def _render_row(  # noqa: C901
-    field_info: pydantic.fields.FieldInfo,
-    field_name: str,
+@functools.cache
+def _render_plan(model_cls: type[Form]) -> tuple[_FieldPlan, ...]:
+    # The fields of a model class are fixed once the class has been created
+    # Therefore everything that depends only on the field is worked out once
+    plans = []
+    for field_name, field_info in model_cls.model_fields.items():
+        if field_name == "csrf_token":
+            continue
+        widget_type = _get_widget_type(field_info)
+        # Skip documentation for CUSTOM widgets
+        # Therefore CUSTOM widgets must handle their own documentation
+        documentation = None
+        json_schema_extra = field_info.json_schema_extra or {}
+        if (widget_type != Widget.CUSTOM) and isinstance(json_schema_extra, dict):
+            documentation_value = json_schema_extra.get("documentation")
+            if isinstance(documentation_value, str):
+                documentation = documentation_value
+        # The discriminator input never changes, so it can be shared between renders
+        discriminator_input = None
+        if (field_name == DISCRIMINATOR_NAME) and (field_info.default is not None):
+            discriminator_input = htpy.input(type="hidden", name=DISCRIMINATOR_NAME, value=field_info.default)
+        plans.append(
+            _FieldPlan(
+                name=field_name,
+                info=field_info,
+                widget_type=widget_type,
+                choices=_get_choices(field_info),
+                label_text=field_info.description or field_name.replace("_", " ").title(),
+                is_required=field_info.is_required(),
+                documentation=documentation,
+                discriminator_input=discriminator_input,
+            )
+        )
+    return tuple(plans)
+
+
+def _render_row(
+    plan: _FieldPlan,
     flash_error_data: dict[str, Any],
     defaults: dict[str, Any] | None,
     errors: dict[str, list[str]] | None,
@@ -829,11 +1050,15 @@ def _render_row(  # noqa: C901
     border: bool,
     wider_widgets: bool,
 ) -> tuple[htm.VoidElement | None, htm.Element | None]:
-    widget_type = _get_widget_type(field_info)
+    if plan.discriminator_input is not None:
+        return plan.discriminator_input, None
+
+    field_name = plan.name
+    widget_type = plan.widget_type
     has_flash_error = field_name in flash_error_data
-    field_value = _render_field_value(field_name, flash_error_data, has_flash_error, defaults, field_info)
+    field_value = _render_field_value(field_name, flash_error_data, has_flash_error, defaults, plan)
 
-    compound_widget = widget_type in (Widget.CHECKBOXES, Widget.FILES)
+    compound_widget = widget_type in _COMPOUND_WIDGETS
     substantial_field_value = field_value is not None
     field_value_is_not_list = not isinstance(field_value, list)
 
@@ -841,10 +1066,6 @@ def _render_row(  # noqa: C901
         field_value = [field_value]
     field_errors = errors.get(field_name) if errors else None
 
-    if (field_name == DISCRIMINATOR_NAME) and (field_info.default is not None):
-        default_value = field_info.default
-        return htpy.input(type="hidden", name=DISCRIMINATOR_NAME, value=default_value), None
-
     if widget_type == Widget.HIDDEN:
         attrs = {"type": "hidden", "name": field_name, "id": field_name}
         if field_value is not None:
@@ -854,252 +1075,335 @@ def _render_row(  # noqa: C901
                 attrs["value"] = str(field_value)
         return htpy.input(**attrs), None
 
-    label_text = field_info.description or field_name.replace("_", " ").title()
-    is_required = field_info.is_required()
-
-    if wider_widgets:
-        label_col_class = "col-sm-2"
-        widget_col_class = ".col-sm-9"
-    else:
-        label_col_class = "col-sm-3"
-        widget_col_class = ".col-sm-8"
-
-    label_classes = f"{label_col_class} col-form-label text-sm-end"
-    label_classes_with_error = f"{label_classes} text-danger" if has_flash_error else label_classes
-    label_elem = htpy.label(for_=field_name, class_=label_classes_with_error)[label_text]
+    label_classes = _LABEL_CLASSES[(wider_widgets, has_flash_error)]
+    label_elem = htpy.label(for_=field_name, class_=label_classes)[plan.label_text]
 
     widget_elem = _render_widget(
         field_name=field_name,
-        field_info=field_info,
+        widget_type=widget_type,
+        choices=plan.choices,
         field_value=field_value,
         field_errors=field_errors,
-        is_required=is_required,
+        is_required=plan.is_required,
         textarea_rows=textarea_rows,
         custom=custom,
         defaults=defaults,
     )
 
-    row_div = htm.div(f".mb-3.pb-3.row{'.border-bottom' if border else ''}")
-    widget_div = htm.div(widget_col_class)
+    row_div = htm.div(_ROW_CLASSES[border])
+    widget_div = htm.div(_WIDGET_COLUMN_CLASSES[wider_widgets])
 
-    widget_div_contents: list[htm.Element | htm.VoidElement] = [widget_elem]
+    widget_div_contents: list[_WidgetElement] = [widget_elem]
     if has_flash_error:
         error_msg = flash_error_data[field_name]["msg"]
         error_div = htm.div(".text-danger.mt-1")[f"Error: {error_msg}"]
         widget_div_contents.append(error_div)
-    else:
-        # Skip documentation for CUSTOM widgets
-        # Therefore CUSTOM widgets must handle their own documentation
-        if widget_type != Widget.CUSTOM:
-            json_schema_extra = field_info.json_schema_extra or {}
-            if isinstance(json_schema_extra, dict):
-                documentation = json_schema_extra.get("documentation")
-                if isinstance(documentation, str):
-                    doc_div = htm.div(".text-muted.mt-1.form-text")[documentation]
-                    widget_div_contents.append(doc_div)
+    elif plan.documentation is not None:
+        doc_div = htm.div(".text-muted.mt-1.form-text")[plan.documentation]
+        widget_div_contents.append(doc_div)
 
     return None, row_div[label_elem, widget_div[widget_div_contents]]
 
 
-def _render_widget(  # noqa: C901
+def _render_widget(
     field_name: str,
-    field_info: pydantic.fields.FieldInfo,
+    widget_type: Widget,
+    choices: Sequence[tuple[str, str]],
     field_value: Any,
     field_errors: list[str] | None,
     is_required: bool,
     textarea_rows: int,
     custom: dict[str, htm.Element | htm.VoidElement] | None,
     defaults: dict[str, Any] | None,
-) -> htm.Element | htm.VoidElement:
-    widget_type = _get_widget_type(field_info)
+) -> _WidgetElement:
     widget_classes = _get_widget_classes(widget_type, field_errors)
+    base_attrs = _base_attrs(field_name, widget_classes)
 
-    base_attrs: dict[str, str] = {"name": field_name, "id": field_name, "class_": widget_classes}
-
-    elements: list[htm.Element | htm.VoidElement] = []
-
-    match widget_type:
-        case Widget.CHECKBOX:
-            attrs: dict[str, str] = {
-                "type": "checkbox",
-                "name": field_name,
-                "id": field_name,
-                "class_": "form-check-input",
-            }
-            if field_value:
-                attrs["checked"] = ""
-            widget = htpy.input(**attrs)
-
-        case Widget.CHECKBOXES:
-            choices = _get_choices(field_info)
-
-            if (not choices) and isinstance(field_value, list) and field_value:
-                # Render list[str] as checkboxes
-                if isinstance(field_value[0], tuple) and (len(field_value[0]) == 2):
-                    choices = field_value
-                    selected_values = []
-                else:
-                    choices = [(str(v), str(v)) for v in field_value]
-                    selected_values = field_value
-            elif isinstance(field_value, set):
-                selected_values = [item.value for item in field_value]
-            else:
-                selected_values = field_value if isinstance(field_value, list) else []
-
-            checkboxes = []
-            for val, label in choices:
-                checkbox_id = f"{field_name}_{val}"
-                checkbox_attrs: dict[str, str] = {
-                    "type": "checkbox",
-                    "name": field_name,
-                    "id": checkbox_id,
-                    "value": val,
-                    "class_": "form-check-input",
-                }
-                if val in selected_values:
-                    checkbox_attrs["checked"] = ""
-                checkbox_input = htpy.input(**checkbox_attrs)
-                checkbox_label = htpy.label(for_=checkbox_id, class_="form-check-label")[label]
-                checkboxes.append(htpy.div(class_="form-check")[checkbox_input, checkbox_label])
-            elements.extend(checkboxes)
-            widget = htm.div[checkboxes]
-
-        case Widget.CUSTOM:
-            if custom and (field_name in custom):
-                widget = custom.pop(field_name)
-            else:
-                widget = htm.div[f"Custom widget for {field_name} not provided"]
+    builder = _WIDGET_BUILDERS[widget_type]
+    elements = builder(field_name, base_attrs, choices, field_value, is_required, textarea_rows, custom, defaults)
 
-        case Widget.EMAIL:
-            attrs = {**base_attrs, "type": "email"}
-            if field_value:
-                attrs["value"] = str(field_value)
-            widget = htpy.input(**attrs)
-
-        case Widget.FILE:
-            widget = htpy.input(type="file", **base_attrs)
+    if field_errors:
+        error_text = " ".join(field_errors)
+        error_div = htm.div(".invalid-feedback.d-block")[error_text]
+        elements.append(error_div)
 
-        case Widget.FILES:
-            attrs = {**base_attrs, "multiple": ""}
-            widget = htpy.input(type="file", **attrs)
+    return htm.div[elements] if (len(elements) > 1) else elements[0]
 
-        case Widget.HIDDEN:
-            attrs = {"type": "hidden", "name": field_name, "id": field_name}
-            if field_value is not None:
-                attrs["value"] = str(field_value)
-            widget = htpy.input(**attrs)
-
-        case Widget.NUMBER:
-            attrs = {**base_attrs, "type": "number"}
-            attrs["value"] = "0" if (field_value is None) else str(field_value)
-            widget = htpy.input(**attrs)
-
-        case Widget.RADIO:
-            # Check for dynamic choices from defaults or field_value
-            dynamic_choices, selected_value = _parse_dynamic_choices(field_name, defaults, field_value)
-            if dynamic_choices:
-                choices = dynamic_choices
-            else:
-                choices = _get_choices(field_info)
-                selected_value = field_value
-
-            radios = []
-            for val, label in choices:
-                radio_id = f"{field_name}_{val}"
-                radio_attrs: dict[str, str] = {
-                    "type": "radio",
-                    "name": field_name,
-                    "id": radio_id,
-                    "value": val,
-                    "class_": "form-check-input",
-                }
-                if is_required:
-                    radio_attrs["required"] = ""
-                if val == selected_value:
-                    radio_attrs["checked"] = ""
-                radio_input = htpy.input(**radio_attrs)
-                radio_label = htpy.label(for_=radio_id, class_="form-check-label")[label]
-                radios.append(htpy.div(class_="form-check")[radio_input, radio_label])
-            elements.extend(radios)
-            widget = htm.div[radios]
-
-        case Widget.SELECT:
-            # Check for dynamic choices from defaults or field_value
-            dynamic_choices, selected_value = _parse_dynamic_choices(field_name, defaults, field_value)
-
-            if dynamic_choices:
-                choices = dynamic_choices
-            else:
-                choices = _get_choices(field_info)
-                # If field_value is an enum, extract its value for comparison
-                if isinstance(field_value, enum.Enum):
-                    selected_value = field_value.value
-                else:
-                    selected_value = field_value
-
-            options = [
-                htpy.option(
-                    value=val,
-                    selected="" if (val == selected_value) else None,
-                )[label]
-                for val, label in choices
-            ]
-            widget = htpy.select(**base_attrs)[options]
-
-        case Widget.TEXT:
-            attrs = {**base_attrs, "type": "text"}
-            if field_value:
-                attrs["value"] = str(field_value)
-            widget = htpy.input(**attrs)
 
-        case Widget.TEXTAREA:
-            attrs = {**base_attrs, "rows": str(textarea_rows)}
-            widget = htpy.textarea(**attrs)[field_value or ""]
+def _selected_values(values: list[Any]) -> frozenset[Any]:
+    # A set makes each membership test constant time, however many choices there are
+    # Unhashable values, such as an empty default set, can never equal a choice value
+    return frozenset(value for value in values if isinstance(value, collections.abc.Hashable))
 
-        case Widget.URL:
-            attrs = {**base_attrs, "type": "url"}
-            if field_value:
-                attrs["value"] = str(field_value)
-            widget = htpy.input(**attrs)
 
-    if not elements:
-        elements.append(widget)
+@functools.cache
+def _type_adapter(model_cls: Any) -> pydantic.TypeAdapter[Any]:
+    # Building a TypeAdapter builds its core schema, which is expensive
+    return pydantic.TypeAdapter(model_cls)
 
-    if field_errors:
-        error_text = " ".join(field_errors)
-        error_div = htm.div(".invalid-feedback.d-block")[error_text]
-        elements.append(error_div)
 
-    return htm.div[elements] if (len(elements) > 1) else elements[0]
+def _unwrap_annotation(annotation: Any) -> tuple[Any, Any]:
+    # Remove type aliases, optional unions, and Annotated wrappers in one walk
+    # Returns the inner annotation and its origin
+    while True:
+        if hasattr(annotation, "__value__"):
+            annotation = annotation.__value__
+            continue
+        origin = get_origin(annotation)
+        if isinstance(annotation, types.UnionType) or (origin is type(None)):
+            non_none_types = [arg for arg in get_args(annotation) if (arg is not type(None))]
+            if non_none_types:
+                annotation = non_none_types[0]
+                continue
+        if origin is Annotated:
+            annotation = get_args(annotation)[0]
+            continue
+        return annotation, origin
 
 
 def _validate_relpath_string(path_str: str) -> pathlib.PurePosixPath:
-    if "\0" in path_str:
-        raise ValueError("Path cannot contain null bytes")
+    path, error_message = _relpath_validation(path_str)
+    if error_message is not None:
+        raise ValueError(error_message)
+    return path
 
-    path_str = unicodedata.normalize("NFC", path_str)
 
-    if "\\" in path_str:
-        raise ValueError("Path cannot contain backslashes")
+# Each widget builder returns the elements of its widget
+# Widgets made of several choices return each choice separately, so that errors can follow them
 
-    # PurePosixPath normalises empty components
-    # Therefore, we must do this check on the path string
-    if "//" in path_str:
-        raise ValueError("Path cannot contain //")
 
-    # Check for absolute paths using both POSIX and Windows semantics
-    # We don't support Windows paths, but we want to detect all bad inputs
-    # PurePosixPath doesn't recognise Windows drive letters as absolute
-    # PureWindowsPath treats leading "/" differently
-    posix_path = pathlib.PurePosixPath(path_str)
-    windows_path = pathlib.PureWindowsPath(path_str)
-    if posix_path.is_absolute() or windows_path.is_absolute():
-        raise ValueError("Absolute paths are not allowed")
-
-    for part in posix_path.parts:
-        if part == "..":
-            raise ValueError("Parent directory references (..) are not allowed")
-        if part == ".":
-            raise ValueError("Self directory references (.) are not allowed")
-
-    return posix_path
+def _widget_checkbox(
+    field_name: str,
+    base_attrs: Mapping[str, str],
+    choices: Sequence[tuple[str, str]],
+    field_value: Any,
+    is_required: bool,
+    textarea_rows: int,
+    custom: dict[str, htm.Element | htm.VoidElement] | None,
+    defaults: dict[str, Any] | None,
+) -> list[_WidgetElement]:
+    checked_attr = ' checked=""' if field_value else ""
+    escaped_name = markupsafe.escape(field_name)
+    return [
+        markupsafe.Markup(
+            f'<input type="checkbox" name="{escaped_name}" id="{escaped_name}" class="form-check-input"{checked_attr}>'
+        )
+    ]
+
+
+def _widget_checkboxes(
+    field_name: str,
+    base_attrs: Mapping[str, str],
+    choices: Sequence[tuple[str, str]],
+    field_value: Any,
+    is_required: bool,
+    textarea_rows: int,
+    custom: dict[str, htm.Element | htm.VoidElement] | None,
+    defaults: dict[str, Any] | None,
+) -> list[_WidgetElement]:
+    if (not choices) and isinstance(field_value, list) and field_value:
+        # Render list[str] as checkboxes
+        if isinstance(field_value[0], tuple) and (len(field_value[0]) == 2):
+            choices = field_value
+            selected_values = frozenset()
+        else:
+            choices = [(str(v), str(v)) for v in field_value]
+            selected_values = _selected_values(field_value)
+    elif isinstance(field_value, set):
+        selected_values = frozenset(item.value for item in field_value)
+    else:
+        selected_values = _selected_values(field_value) if isinstance(field_value, list) else frozenset()
+
+    checkboxes: list[_WidgetElement] = []
+    if isinstance(choices, tuple):
+        # Static choices from the render plan are prerendered once
+        for val, unchecked, checked in _choice_fragments("checkbox", field_name, choices, False):
+            checkboxes.append(checked if (val in selected_values) else unchecked)
+    else:
+        for val, label in choices:
+            checkboxes.append(_choice_html("checkbox", field_name, val, label, False, val in selected_values))
+    return checkboxes or [htm.div[checkboxes]]
+
+
+def _widget_custom(
+    field_name: str,
+    base_attrs: Mapping[str, str],
+    choices: Sequence[tuple[str, str]],
+    field_value: Any,
+    is_required: bool,
+    textarea_rows: int,
+    custom: dict[str, htm.Element | htm.VoidElement] | None,
+    defaults: dict[str, Any] | None,
+) -> list[_WidgetElement]:
+    if custom and (field_name in custom):
+        return [custom.pop(field_name)]
+    return [_missing_custom_widget(field_name)]
+
+
+def _widget_file(
+    field_name: str,
+    base_attrs: Mapping[str, str],
+    choices: Sequence[tuple[str, str]],
+    field_value: Any,
+    is_required: bool,
+    textarea_rows: int,
+    custom: dict[str, htm.Element | htm.VoidElement] | None,
+    defaults: dict[str, Any] | None,
+) -> list[_WidgetElement]:
+    return [htpy.input(type="file", name=field_name, id=field_name, class_=base_attrs["class_"])]
+
+
+def _widget_files(
+    field_name: str,
+    base_attrs: Mapping[str, str],
+    choices: Sequence[tuple[str, str]],
+    field_value: Any,
+    is_required: bool,
+    textarea_rows: int,
+    custom: dict[str, htm.Element | htm.VoidElement] | None,
+    defaults: dict[str, Any] | None,
+) -> list[_WidgetElement]:
+    return [htpy.input(type="file", name=field_name, id=field_name, class_=base_attrs["class_"], multiple="")]
+
+
+def _widget_hidden(
+    field_name: str,
+    base_attrs: Mapping[str, str],
+    choices: Sequence[tuple[str, str]],
+    field_value: Any,
+    is_required: bool,
+    textarea_rows: int,
+    custom: dict[str, htm.Element | htm.VoidElement] | None,
+    defaults: dict[str, Any] | None,
+) -> list[_WidgetElement]:
+    attrs = {"type": "hidden", "name": field_name, "id": field_name}
+    if field_value is not None:
+        attrs["value"] = str(field_value)
+    return [htpy.input(**attrs)]
+
+
+def _widget_input(
+    input_type: str,
+    field_name: str,
+    base_attrs: Mapping[str, str],
+    choices: Sequence[tuple[str, str]],
+    field_value: Any,
+    is_required: bool,
+    textarea_rows: int,
+    custom: dict[str, htm.Element | htm.VoidElement] | None,
+    defaults: dict[str, Any] | None,
+) -> list[_WidgetElement]:
+    # Used for the EMAIL, TEXT, and URL widgets
+    # Explicit keywords are cheaper than unpacking a merged dictionary
+    widget_classes = base_attrs["class_"]
+    if field_value:
+        return [
+            htpy.input(name=field_name, id=field_name, class_=widget_classes, type=input_type, value=str(field_value))
+        ]
+    return [htpy.input(name=field_name, id=field_name, class_=widget_classes, type=input_type)]
+
+
+def _widget_number(
+    field_name: str,
+    base_attrs: Mapping[str, str],
+    choices: Sequence[tuple[str, str]],
+    field_value: Any,
+    is_required: bool,
+    textarea_rows: int,
+    custom: dict[str, htm.Element | htm.VoidElement] | None,
+    defaults: dict[str, Any] | None,
+) -> list[_WidgetElement]:
+    value = "0" if (field_value is None) else str(field_value)
+    return [htpy.input(name=field_name, id=field_name, class_=base_attrs["class_"], type="number", value=value)]
+
+
+def _widget_radio(
+    field_name: str,
+    base_attrs: Mapping[str, str],
+    choices: Sequence[tuple[str, str]],
+    field_value: Any,
+    is_required: bool,
+    textarea_rows: int,
+    custom: dict[str, htm.Element | htm.VoidElement] | None,
+    defaults: dict[str, Any] | None,
+) -> list[_WidgetElement]:
+    # Check for dynamic choices from defaults or field_value
+    dynamic_choices, selected_value = _parse_dynamic_choices(field_name, defaults, field_value)
+    if dynamic_choices:
+        choices = dynamic_choices
+    else:
+        selected_value = field_value
+
+    radios: list[_WidgetElement] = []
+    if isinstance(choices, tuple):
+        # Static choices from the render plan are prerendered once
+        for val, unchecked, checked in _choice_fragments("radio", field_name, choices, is_required):
+            radios.append(checked if (val == selected_value) else unchecked)
+    else:
+        for val, label in choices:
+            radios.append(_choice_html("radio", field_name, val, label, is_required, val == selected_value))
+    return radios or [htm.div[radios]]
+
+
+def _widget_select(
+    field_name: str,
+    base_attrs: Mapping[str, str],
+    choices: Sequence[tuple[str, str]],
+    field_value: Any,
+    is_required: bool,
+    textarea_rows: int,
+    custom: dict[str, htm.Element | htm.VoidElement] | None,
+    defaults: dict[str, Any] | None,
+) -> list[_WidgetElement]:
+    # Check for dynamic choices from defaults or field_value
+    dynamic_choices, selected_value = _parse_dynamic_choices(field_name, defaults, field_value)
+
+    if dynamic_choices:
+        choices = dynamic_choices
+    else:
+        # If field_value is an enum, extract its value for comparison
+        if isinstance(field_value, enum.Enum):
+            selected_value = field_value.value
+        else:
+            selected_value = field_value
+
+    options = [
+        htpy.option(
+            value=val,
+            selected="" if (val == selected_value) else None,
+        )[label]
+        for val, label in choices
+    ]
+    return [htpy.select(**base_attrs)[options]]
+
+
+def _widget_textarea(
+    field_name: str,
+    base_attrs: Mapping[str, str],
+    choices: Sequence[tuple[str, str]],
+    field_value: Any,
+    is_required: bool,
+    textarea_rows: int,
+    custom: dict[str, htm.Element | htm.VoidElement] | None,
+    defaults: dict[str, Any] | None,
+) -> list[_WidgetElement]:
+    attrs = {**base_attrs, "rows": str(textarea_rows)}
+    return [htpy.textarea(**attrs)[field_value or ""]]
+
+
+# This must come after the widget builders
+_WIDGET_BUILDERS: Final[dict[Widget, Callable[..., list[_WidgetElement]]]] = {
+    Widget.CHECKBOX: _widget_checkbox,
+    Widget.CHECKBOXES: _widget_checkboxes,
+    Widget.CUSTOM: _widget_custom,
+    Widget.EMAIL: functools.partial(_widget_input, "email"),
+    Widget.FILE: _widget_file,
+    Widget.FILES: _widget_files,
+    Widget.HIDDEN: _widget_hidden,
+    Widget.NUMBER: _widget_number,
+    Widget.RADIO: _widget_radio,
+    Widget.SELECT: _widget_select,
+    Widget.TEXT: functools.partial(_widget_input, "text"),
+    Widget.TEXTAREA: _widget_textarea,
+    Widget.URL: functools.partial(_widget_input, "url"),
+}
@@ -15,6 +15,9 @@
 # specific language governing permissions and limitations
 # under the License.
 
+import datetime
+import functools
+from typing import Final
 
 import htpy
 import markupsafe
@@ -34,6 +37,20 @@ import atr.template as template
 import atr.util as util
 import atr.web as web
 
+_FORM_CHECK: Final = "form-check"
+_FORM_CHECK_INPUT: Final = "form-check-input"
+_FORM_CHECK_LABEL: Final = "form-check-label"
+
+# Shared by every render, because the warning does not depend on the request
+_MAILING_LIST_WARNING: Final = htm.div(".card.bg-warning-subtle.mb-3")[
+    htm.span(".card-body.p-3")[
+        htpy.i(".bi.bi-exclamation-triangle.me-1"),
+        htm.strong["TODO: "],
+        "The limited options above are provided for testing purposes. In the finished version of ATR, "
+        "you will be able to send to your own specified mailing lists.",
+    ]
+]
+
 
 @get.committer("/announce/<project_name>/<version_name>")
 async def selected(session: web.Committer, project_name: str, version_name: str) -> str | web.WerkzeugResponse:
@@ -41,7 +58,11 @@ async def selected(session: web.Committer, project_name: str, version_name: str)
     await session.check_access(project_name)
 
     release = await session.release(
-        project_name, version_name, with_committee=True, phase=sql.ReleasePhase.RELEASE_PREVIEW
+        project_name,
+        version_name,
+        with_committee=True,
+        phase=sql.ReleasePhase.RELEASE_PREVIEW,
+        with_project_release_policy=True,
     )
 
     latest_revision_number = release.latest_revision_number
@@ -52,9 +73,12 @@ async def selected(session: web.Committer, project_name: str, version_name: str)
             name=project_name,
         )
 
-    # Get the templates from the release policy
-    default_subject_template = await construct.announce_release_subject_default(project_name)
-    default_body_template = await construct.announce_release_default(project_name)
+    # Get the templates from the release policy, which was loaded with the release
+    # The policy is not cached, because it can be edited without making a new revision
+    if release.project.status != sql.ProjectStatus.ACTIVE:
+        raise RuntimeError(f"Project {project_name} not found")
+    default_subject_template = release.project.policy_announce_release_subject
+    default_body_template = release.project.policy_announce_release_template
     subject_template_hash = construct.template_hash(default_subject_template)
 
     # Expand the templates
@@ -83,8 +107,8 @@ async def selected(session: web.Committer, project_name: str, version_name: str)
         description_download_prefix += "/incubator"
     description_download_prefix += f"/{committee.name}"
 
-    permitted_recipients = util.permitted_announce_recipients(session.uid)
-    mailing_list_choices = sorted([(recipient, recipient) for recipient in permitted_recipients])
+    permitted_recipients = frozenset(util.permitted_announce_recipients(session.uid))
+    mailing_list_choices = _mailing_list_choices(permitted_recipients)
 
     content = await _render_page(
         release=release,
@@ -104,6 +128,27 @@ async def selected(session: web.Committer, project_name: str, version_name: str)
     )
 
 
+@functools.lru_cache(maxsize=1024)
+def _mailing_list_choices(recipients: frozenset[str]) -> tuple[tuple[str, str], ...]:
+    # The tuple is immutable, so the same choices can be shared between requests
+    return tuple(sorted((recipient, recipient) for recipient in recipients))
+
+
+@functools.lru_cache(maxsize=1024)
+def _release_card(name: str, revision_number: str | None, created: datetime.datetime) -> htm.Element:
+    # The element is never modified after construction, so it is safe to share between pages
+    card = htm.div(f"#{name}.card.mb-4.shadow-sm")[
+        htm.div(".card-header.bg-light")[htm.h3(".card-title.mb-0")["About this release preview"]],
+        htm.div(".card-body")[
+            htm.div(".d-flex.flex-wrap.gap-3.pb-1.text-secondary.fs-6")[
+                htm.span(".page-preview-meta-item")[f"Revision: {revision_number}"],
+                htm.span(".page-preview-meta-item")[f"Created: {created.strftime('%Y-%m-%d %H:%M:%S UTC')}"],
+            ],
+        ],
+    ]
+    return card
+
+
 def _render_body_field(default_body: str, project_name: str) -> htm.Element:
     """Render the body textarea with a link to edit the template."""
     textarea = htpy.textarea(
@@ -136,7 +181,7 @@ def _render_download_path_field(default_value: str, description: str) -> htm.Ele
     ]
 
 
-def _render_mailing_list_with_warning(choices: list[tuple[str, str]], default_value: str) -> htm.Element:
+def _render_mailing_list_with_warning(choices: tuple[tuple[str, str], ...], default_value: str) -> htm.Element:
     """Render the mailing list radio buttons with a warning card."""
     container = htm.Block(htm.div)
 
@@ -145,7 +190,10 @@ def _render_mailing_list_with_warning(choices: list[tuple[str, str]], default_va
     radio_buttons = []
     for value, label in choices:
         radio_id = f"mailing_list_{value}"
+        # Pass the id and class as attributes, because addresses contain dots that a selector would split
         radio_attrs = {
+            "id": radio_id,
+            "class_": _FORM_CHECK_INPUT,
             "type": "radio",
             "name": "mailing_list",
             "value": value,
@@ -154,30 +202,22 @@ def _render_mailing_list_with_warning(choices: list[tuple[str, str]], default_va
             radio_attrs["checked"] = ""
 
         radio_buttons.append(
-            htm.div(".form-check")[
-                htpy.input(f"#{radio_id}.form-check-input", **radio_attrs),
-                htpy.label(".form-check-label", for_=radio_id)[label],
+            htpy.div(class_=_FORM_CHECK)[
+                htpy.input(**radio_attrs),
+                htpy.label(class_=_FORM_CHECK_LABEL, for_=radio_id)[label],
             ]
         )
     container.append(radio_container[radio_buttons])
 
     # Warning card
-    warning_card = htm.div(".card.bg-warning-subtle.mb-3")[
-        htm.span(".card-body.p-3")[
-            htpy.i(".bi.bi-exclamation-triangle.me-1"),
-            htm.strong["TODO: "],
-            "The limited options above are provided for testing purposes. In the finished version of ATR, "
-            "you will be able to send to your own specified mailing lists.",
-        ]
-    ]
-    container.append(warning_card)
+    container.append(_MAILING_LIST_WARNING)
 
     return container.collect()
 
 
 async def _render_page(
     release: sql.Release,
-    mailing_list_choices: list[tuple[str, str]],
+    mailing_list_choices: tuple[tuple[str, str], ...],
     default_subject: str,
     subject_template_hash: str,
     default_body: str,
@@ -201,11 +241,11 @@ async def _render_page(
 
     render.html_nav_phase(page, release.project.name, release.version, staging=False)
 
+    # Markup.format escapes the arguments, so the heading needs no child elements
     page.h1[
-        "Announce ",
-        htm.strong[release.project.short_display_name],
-        " ",
-        htm.em[release.version],
+        markupsafe.Markup("Announce <strong>{}</strong> <em>{}</em>").format(
+            release.project.short_display_name, release.version
+        )
     ]
     page.append(_render_release_card(release))
     page.h2["Announce this release"]
@@ -246,16 +286,8 @@ async def _render_page(
 
 def _render_release_card(release: sql.Release) -> htm.Element:
     """Render the release information card."""
-    card = htm.div(f"#{release.name}.card.mb-4.shadow-sm")[
-        htm.div(".card-header.bg-light")[htm.h3(".card-title.mb-0")["About this release preview"]],
-        htm.div(".card-body")[
-            htm.div(".d-flex.flex-wrap.gap-3.pb-1.text-secondary.fs-6")[
-                htm.span(".page-preview-meta-item")[f"Revision: {release.latest_revision_number}"],
-                htm.span(".page-preview-meta-item")[f"Created: {release.created.strftime('%Y-%m-%d %H:%M:%S UTC')}"],
-            ],
-        ],
-    ]
-    return card
+    # Release instances are not hashable, so the card is cached by the values that it shows
+    return _release_card(release.name, release.latest_revision_number, release.created)
 
 
 def _render_subject_field(default_subject: str, project_name: str) -> htm.Element:
@@ -15,13 +15,18 @@
 # specific language governing permissions and limitations
 # under the License.
 
+import asyncio
+import dataclasses
 import pathlib
-from collections.abc import Callable
-from typing import NamedTuple
+from collections.abc import Callable, Sequence
+from typing import Final, NamedTuple
 
 import asfquart.base as base
 import htpy
 import quart
+import sqlalchemy
+import sqlalchemy.orm as orm
+import sqlmodel
 
 import atr.blueprints.get as get
 import atr.db as db
@@ -43,8 +48,62 @@ import atr.template as template
 import atr.util as util
 import atr.web as web
 
+type _CheckResultCount = sqlalchemy.Row[str | None, bool, sql.CheckResultStatus, int]
 
-class FileStats(NamedTuple):
+# Successes are never ignored, so they can be counted by the database without loading any rows
+_CHECK_RESULT_COUNTS: Final = (
+    sqlmodel.select(
+        sql.CheckResult.primary_rel_path,
+        sql.validate_instrumented_attribute(sql.CheckResult.member_rel_path).is_not(None),
+        sql.CheckResult.status,
+        sqlalchemy.func.count(),
+    )
+    .where(
+        sql.CheckResult.release_name == sqlalchemy.bindparam("release_name"),
+        sql.CheckResult.revision_number == sqlalchemy.bindparam("revision_number"),
+    )
+    .group_by(
+        sql.CheckResult.primary_rel_path,
+        sql.validate_instrumented_attribute(sql.CheckResult.member_rel_path).is_not(None),
+        sql.CheckResult.status,
+    )
+)
+
+# Only the columns that ignore rules inspect are loaded, which leaves out the potentially large data column
+_CHECK_RESULT_IGNORABLE: Final = (
+    sqlmodel.select(sql.CheckResult)
+    .where(
+        sql.CheckResult.release_name == sqlalchemy.bindparam("release_name"),
+        sql.CheckResult.revision_number == sqlalchemy.bindparam("revision_number"),
+        sql.CheckResult.status != sql.CheckResultStatus.SUCCESS,
+    )
+    .options(
+        orm.load_only(
+            sql.validate_instrumented_attribute(sql.CheckResult.release_name),
+            sql.validate_instrumented_attribute(sql.CheckResult.revision_number),
+            sql.validate_instrumented_attribute(sql.CheckResult.checker),
+            sql.validate_instrumented_attribute(sql.CheckResult.primary_rel_path),
+            sql.validate_instrumented_attribute(sql.CheckResult.member_rel_path),
+            sql.validate_instrumented_attribute(sql.CheckResult.status),
+            sql.validate_instrumented_attribute(sql.CheckResult.message),
+        )
+    )
+)
+
+# Offsets into the FileStats fields, which are in pass, warn, err order, before then after, file then member
+_STATS_AFTER_OFFSET: Final = 3
+_STATS_MEMBER_OFFSET: Final = 6
+_STATS_STATUS_OFFSETS: Final = {
+    sql.CheckResultStatus.SUCCESS: 0,
+    sql.CheckResultStatus.WARNING: 1,
+    sql.CheckResultStatus.FAILURE: 2,
+    sql.CheckResultStatus.EXCEPTION: 2,
+}
+_STATS_WIDTH: Final = 12
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class FileStats:
     file_pass_before: int
     file_warn_before: int
     file_err_before: int
@@ -57,30 +116,55 @@ class FileStats(NamedTuple):
     member_pass_after: int
     member_warn_after: int
     member_err_after: int
-
-    @property
-    def total_pass_before(self) -> int:
-        return self.file_pass_before + self.member_pass_before
-
-    @property
-    def total_warn_before(self) -> int:
-        return self.file_warn_before + self.member_warn_before
-
-    @property
-    def total_err_before(self) -> int:
-        return self.file_err_before + self.member_err_before
-
-    @property
-    def total_pass_after(self) -> int:
-        return self.file_pass_after + self.member_pass_after
-
-    @property
-    def total_warn_after(self) -> int:
-        return self.file_warn_after + self.member_warn_after
-
-    @property
-    def total_err_after(self) -> int:
-        return self.file_err_after + self.member_err_after
+    # The totals are computed once on construction, rather than on every access
+    total_pass_before: int = dataclasses.field(init=False)
+    total_warn_before: int = dataclasses.field(init=False)
+    total_err_before: int = dataclasses.field(init=False)
+    total_pass_after: int = dataclasses.field(init=False)
+    total_warn_after: int = dataclasses.field(init=False)
+    total_err_after: int = dataclasses.field(init=False)
+
+    def __post_init__(self) -> None:
+        # The class is frozen, so the totals must bypass its __setattr__
+        object.__setattr__(self, "total_pass_before", self.file_pass_before + self.member_pass_before)
+        object.__setattr__(self, "total_warn_before", self.file_warn_before + self.member_warn_before)
+        object.__setattr__(self, "total_err_before", self.file_err_before + self.member_err_before)
+        object.__setattr__(self, "total_pass_after", self.file_pass_after + self.member_pass_after)
+        object.__setattr__(self, "total_warn_after", self.file_warn_after + self.member_warn_after)
+        object.__setattr__(self, "total_err_after", self.file_err_after + self.member_err_after)
+
+
+# Bootstrap does have striping, but that's for horizontal stripes
+# These are vertical stripes, to make it easier to distinguish collections
+_DEBUG_STRIPE_A: Final = "background-color: #f0f0f0; text-align: center;"
+_DEBUG_STRIPE_B: Final = "background-color: #ffffff; text-align: center;"
+# One cell for each value of a debug table row, in the order of _debug_row_values
+_DEBUG_CELLS: Final = (
+    (htpy.td(style=_DEBUG_STRIPE_A),) * 3
+    + (htpy.td(style=_DEBUG_STRIPE_B),) * 3
+    + (htpy.td(style=_DEBUG_STRIPE_A),) * 3
+    + (htpy.td(style=_DEBUG_STRIPE_B),) * 3
+    + (htpy.td(style=_DEBUG_STRIPE_A),) * 3
+    + (htpy.td(style=_DEBUG_STRIPE_B),) * 3
+)
+_EMPTY_STATS: Final = FileStats(0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+
+# The attributes of the count cells are parsed once, and the cells without a count are built once
+_NUM_STYLE: Final = "font-size: 1.1rem;"
+_ERROR_STRONG_CELL: Final = htpy.span(".text-danger.fw-bold", style=_NUM_STYLE)
+_MUTED_DASH_CELL: Final = htpy.span(".text-muted", style=_NUM_STYLE)["-"]
+_MUTED_ZERO_CELL: Final = htpy.span(".text-muted", style=_NUM_STYLE)["0"]
+_NO_CHECKS_BUTTON: Final = htpy.span(".btn.btn-sm.btn-outline-secondary.disabled")["No checks"]
+_SUCCESS_CELL: Final = htpy.span(".text-success", style=_NUM_STYLE)
+_WARNING_CELL: Final = htpy.span(".text-warning", style=_NUM_STYLE)
+_WARNING_STRONG_CELL: Final = htpy.span(".text-warning.fw-bold", style=_NUM_STYLE)
+
+
+class _StatsInputs(NamedTuple):
+    paths: list[pathlib.Path]
+    match_ignore: Callable[[sql.CheckResult], bool]
+    count_rows: Sequence[_CheckResultCount]
+    ignorable_results: Sequence[sql.CheckResult]
 
 
 async def get_file_totals(release: sql.Release, session: web.Committer | None) -> FileStats:
@@ -88,14 +172,8 @@ async def get_file_totals(release: sql.Release, session: web.Committer | None) -
     if release.committee is None:
         raise ValueError("Release has no committee")
 
-    base_path = util.release_directory(release)
-    paths = [path async for path in util.paths_recursive(base_path)]
-
-    async with storage.read(session) as read:
-        ragp = read.as_general_public()
-        match_ignore = await ragp.checks.ignores_matcher(release.committee.name)
-
-    _, totals = await _compute_stats(release, paths, match_ignore)
+    inputs = await _stats_inputs(release, release.committee.name, session)
+    _, totals = _compute_stats(inputs.paths, inputs.match_ignore, inputs.count_rows, inputs.ignorable_results)
     return totals
 
 
@@ -113,22 +191,22 @@ async def selected(session: web.Committer | None, project_name: str, version_nam
     if release.committee is None:
         raise ValueError("Release has no committee")
 
-    base_path = util.release_directory(release)
-    paths = [path async for path in util.paths_recursive(base_path)]
-    paths.sort()
+    inputs = await _stats_inputs(release, release.committee.name, session)
+    # The inputs may be shared with other callers in this request, so the paths are sorted into a new list
+    paths = sorted(inputs.paths)
 
-    async with storage.read(session) as read:
-        ragp = read.as_general_public()
-        match_ignore = await ragp.checks.ignores_matcher(release.committee.name)
-
-    per_file_stats, totals = await _compute_stats(release, paths, match_ignore)
+    per_file_stats, totals = _compute_stats(paths, inputs.match_ignore, inputs.count_rows, inputs.ignorable_results)
 
     page = htm.Block()
     _render_header(page, release)
     _render_summary(page, totals, paths, per_file_stats)
     _render_checks_table(page, release, paths, per_file_stats)
     _render_ignores_section(page, release)
-    _render_debug_table(page, paths, per_file_stats)
+    # The statistics table has a row for every file, but is rarely opened, so it is only built on request
+    if quart.request.args.get("debug") == "1":
+        _render_debug_table(page, paths, per_file_stats)
+    else:
+        _render_debug_link(page, release)
 
     return await template.blank(
         f"File checks for {release.project.short_display_name} {release.version}",
@@ -206,85 +284,99 @@ async def selected_revision(
     )
 
 
-async def _compute_stats(  # noqa: C901
+async def _check_results(
     release: sql.Release,
+) -> tuple[Sequence[_CheckResultCount], Sequence[sql.CheckResult]]:
+    if release.latest_revision_number is None:
+        # TODO: Or raise an exception?
+        return (), ()
+
+    params = {"release_name": release.name, "revision_number": release.latest_revision_number}
+    async with db.session(readonly=True) as data:
+        count_rows = (await data.execute(_CHECK_RESULT_COUNTS, params)).all()
+        ignorable_results = (await data.execute(_CHECK_RESULT_IGNORABLE, params)).scalars().all()
+    return count_rows, ignorable_results
+
+
+def _compute_stats(
     paths: list[pathlib.Path],
     match_ignore: Callable[[sql.CheckResult], bool],
+    count_rows: Sequence[_CheckResultCount],
+    ignorable_results: Sequence[sql.CheckResult],
 ) -> tuple[dict[pathlib.Path, FileStats], FileStats]:
-    per_file: dict[pathlib.Path, dict[str, int]] = {
-        p: {
-            "file_pass_before": 0,
-            "file_warn_before": 0,
-            "file_err_before": 0,
-            "file_pass_after": 0,
-            "file_warn_after": 0,
-            "file_err_after": 0,
-            "member_pass_before": 0,
-            "member_warn_before": 0,
-            "member_err_before": 0,
-            "member_pass_after": 0,
-            "member_warn_after": 0,
-            "member_err_after": 0,
-        }
-        for p in paths
-    }
+    # Most files have no results, so counts are only allocated for files that do
+    # Each list holds the counts in FileStats field order
+    known_paths = frozenset(paths)
+    per_file: dict[pathlib.Path, list[int]] = {}
+
+    # Count every result as not ignored first
+    for primary_rel_path, is_member, status, count in count_rows:
+        if not primary_rel_path:
+            continue
 
-    if release.latest_revision_number is None:
-        # TODO: Or raise an exception?
-        empty_stats = FileStats(0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
-        return {p: empty_stats for p in paths}, empty_stats
+        file_path = pathlib.Path(primary_rel_path)
+        if file_path not in known_paths:
+            continue
 
-    async with db.session() as data:
-        check_results = await data.check_result(
-            release_name=release.name,
-            revision_number=release.latest_revision_number,
-        ).all()
+        if (cell := per_file.get(file_path)) is None:
+            cell = per_file[file_path] = [0] * _STATS_WIDTH
+        column = _stats_column(bool(is_member), status)
+        cell[column] += count
+        cell[column + _STATS_AFTER_OFFSET] += count
 
-    for cr in check_results:
+    # Then remove the ignored results from the after counts
+    for cr in ignorable_results:
         if not cr.primary_rel_path:
             continue
 
+        # Every ignorable result was also counted, so its file already has counts if it is known
         file_path = pathlib.Path(cr.primary_rel_path)
-        if file_path not in per_file:
+        if (file_path not in per_file) or (not match_ignore(cr)):
             continue
 
-        is_member = cr.member_rel_path is not None
-        is_ignored = match_ignore(cr)
-        prefix = "member" if is_member else "file"
-
-        if cr.status == sql.CheckResultStatus.SUCCESS:
-            per_file[file_path][f"{prefix}_pass_before"] += 1
-            per_file[file_path][f"{prefix}_pass_after"] += 1
-        elif cr.status == sql.CheckResultStatus.WARNING:
-            per_file[file_path][f"{prefix}_warn_before"] += 1
-            if not is_ignored:
-                per_file[file_path][f"{prefix}_warn_after"] += 1
-        else:
-            per_file[file_path][f"{prefix}_err_before"] += 1
-            if not is_ignored:
-                per_file[file_path][f"{prefix}_err_after"] += 1
-
-    per_file_stats = {p: FileStats(**c) for p, c in per_file.items()}
-
-    total_counts = {
-        "file_pass_before": 0,
-        "file_warn_before": 0,
-        "file_err_before": 0,
-        "file_pass_after": 0,
-        "file_warn_after": 0,
-        "file_err_after": 0,
-        "member_pass_before": 0,
-        "member_warn_before": 0,
-        "member_err_before": 0,
-        "member_pass_after": 0,
-        "member_warn_after": 0,
-        "member_err_after": 0,
-    }
-    for stats in per_file_stats.values():
-        for field in total_counts:
-            total_counts[field] += getattr(stats, field)
-
-    return per_file_stats, FileStats(**total_counts)
+        column = _stats_column(cr.member_rel_path is not None, cr.status)
+        per_file[file_path][column + _STATS_AFTER_OFFSET] -= 1
+
+    per_file_stats = {p: (FileStats(*cell) if (cell := per_file.get(p)) else _EMPTY_STATS) for p in paths}
+
+    # Files without counts add nothing, so only the allocated counts are summed, column by column
+    if not per_file:
+        return per_file_stats, _EMPTY_STATS
+    return per_file_stats, FileStats(*map(sum, zip(*per_file.values(), strict=True)))
+
+
+def _debug_row_values(stats: FileStats) -> tuple[int, ...]:
+    return (
+        stats.file_pass_before,
+        stats.file_warn_before,
+        stats.file_err_before,
+        stats.file_pass_after,
+        stats.file_warn_after,
+        stats.file_err_after,
+        stats.member_pass_before,
+        stats.member_warn_before,
+        stats.member_err_before,
+        stats.member_pass_after,
+        stats.member_warn_after,
+        stats.member_err_after,
+        stats.total_pass_before,
+        stats.total_warn_before,
+        stats.total_err_before,
+        stats.total_pass_after,
+        stats.total_warn_after,
+        stats.total_err_after,
+    )
+
+
+async def _ignores_matcher(session: web.Committer | None, committee_name: str) -> Callable[[sql.CheckResult], bool]:
+    async with storage.read(session, readonly=True) as read:
+        ragp = read.as_general_public()
+        return await ragp.checks.ignores_matcher(committee_name)
+
+
+async def _paths(release: sql.Release) -> list[pathlib.Path]:
+    base_path = util.release_directory(release)
+    return [path async for path in util.paths_recursive(base_path)]
 
 
 def _render_checks_table(
@@ -314,22 +406,30 @@ def _render_checks_table(
 
     tbody = htm.Block(htpy.tbody)
     for path in paths:
-        stats = per_file_stats.get(path, FileStats(0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0))
+        stats = per_file_stats.get(path, _EMPTY_STATS)
         _render_file_row(tbody, release, path, stats)
     table.append(tbody.collect())
 
     page.div(".table-responsive.card.mb-4")[table.collect()]
 
 
+def _render_debug_link(page: htm.Block, release: sql.Release) -> None:
+    debug_url = util.as_url(selected, project_name=release.project.name, version_name=release.version, debug="1")
+    page.append(
+        htpy.details("#all-statistics.mt-4")[
+            htpy.summary["All statistics"],
+            htpy.p(".mt-3")[htpy.a(href=f"{debug_url}#all-statistics")["Show the statistics for every file"]],
+        ]
+    )
+
+
 def _render_debug_table(
     page: htm.Block,
     paths: list[pathlib.Path],
     per_file_stats: dict[pathlib.Path, FileStats],
 ) -> None:
-    # Bootstrap does have striping, but that's for horizontal stripes
-    # These are vertical stripes, to make it easier to distinguish collections
-    stripe_a = "background-color: #f0f0f0; text-align: center;"
-    stripe_b = "background-color: #ffffff; text-align: center;"
+    stripe_a = _DEBUG_STRIPE_A
+    stripe_b = _DEBUG_STRIPE_B
 
     table = htm.Block(htpy.table, classes=".table.table-bordered.table-sm.mb-0.text-center")
 
@@ -367,32 +467,15 @@ def _render_debug_table(
 
     tbody = htm.Block(htpy.tbody)
     for path in paths:
-        stats = per_file_stats.get(path, FileStats(0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0))
+        stats = per_file_stats.get(path, _EMPTY_STATS)
         tbody.tr[
             htpy.td(class_="text-start")[htpy.code[str(path)]],
-            htpy.td(style=stripe_a)[str(stats.file_pass_before)],
-            htpy.td(style=stripe_a)[str(stats.file_warn_before)],
-            htpy.td(style=stripe_a)[str(stats.file_err_before)],
-            htpy.td(style=stripe_b)[str(stats.file_pass_after)],
-            htpy.td(style=stripe_b)[str(stats.file_warn_after)],
-            htpy.td(style=stripe_b)[str(stats.file_err_after)],
-            htpy.td(style=stripe_a)[str(stats.member_pass_before)],
-            htpy.td(style=stripe_a)[str(stats.member_warn_before)],
-            htpy.td(style=stripe_a)[str(stats.member_err_before)],
-            htpy.td(style=stripe_b)[str(stats.member_pass_after)],
-            htpy.td(style=stripe_b)[str(stats.member_warn_after)],
-            htpy.td(style=stripe_b)[str(stats.member_err_after)],
-            htpy.td(style=stripe_a)[str(stats.total_pass_before)],
-            htpy.td(style=stripe_a)[str(stats.total_warn_before)],
-            htpy.td(style=stripe_a)[str(stats.total_err_before)],
-            htpy.td(style=stripe_b)[str(stats.total_pass_after)],
-            htpy.td(style=stripe_b)[str(stats.total_warn_after)],
-            htpy.td(style=stripe_b)[str(stats.total_err_after)],
+            *[cell[str(count)] for cell, count in zip(_DEBUG_CELLS, _debug_row_values(stats), strict=True)],
         ]
     table.append(tbody.collect())
 
     page.append(
-        htpy.details(".mt-4")[
+        htpy.details("#all-statistics.mt-4", open="")[
             htpy.summary["All statistics"],
             htpy.div(".table-responsive.mt-3")[table.collect()],
         ]
@@ -406,7 +489,6 @@ def _render_file_row(
     stats: FileStats,
 ) -> None:
     path_str = str(path)
-    num_style = "font-size: 1.1rem;"
 
     pass_count = stats.file_pass_after
     warn_count = stats.file_warn_after
@@ -428,47 +510,31 @@ def _render_file_row(
     )
     sbom_url = util.as_url(sbom.report, project=release.project.name, version=release.version, file_path=path_str)
 
+    # Cells which do not show a count are shared, and only the counts are built for each row
     if not has_checks_before:
         path_display = htpy.code(".text-muted")[path_str]
-        pass_cell = htpy.span(".text-muted", style=num_style)["-"]
-        warn_cell = htpy.span(".text-muted", style=num_style)["-"]
-        err_cell = htpy.span(".text-muted", style=num_style)["-"]
-        report_btn = htpy.span(".btn.btn-sm.btn-outline-secondary.disabled")["No checks"]
+        pass_cell = warn_cell = err_cell = _MUTED_DASH_CELL
+        report_btn = _NO_CHECKS_BUTTON
     elif not has_checks_after:
         path_display = htpy.code[path_str]
-        pass_cell = htpy.span(".text-muted", style=num_style)["0"]
-        warn_cell = htpy.span(".text-muted", style=num_style)["0"]
-        err_cell = htpy.span(".text-muted", style=num_style)["0"]
+        pass_cell = warn_cell = err_cell = _MUTED_ZERO_CELL
         report_btn = htpy.a(".btn.btn-sm.btn-outline-secondary", href=report_url)["Show details"]
     elif err_count > 0:
         path_display = htpy.strong[htpy.code(".text-danger")[path_str]]
-        pass_cell = (
-            htpy.span(".text-success", style=num_style)[str(pass_count)]
-            if (pass_count > 0)
-            else htpy.span(".text-muted", style=num_style)["0"]
-        )
-        warn_cell = (
-            htpy.span(".text-warning", style=num_style)[str(warn_count)]
-            if (warn_count > 0)
-            else htpy.span(".text-muted", style=num_style)["0"]
-        )
-        err_cell = htpy.span(".text-danger.fw-bold", style=num_style)[str(err_count)]
+        pass_cell = _SUCCESS_CELL[str(pass_count)] if (pass_count > 0) else _MUTED_ZERO_CELL
+        warn_cell = _WARNING_CELL[str(warn_count)] if (warn_count > 0) else _MUTED_ZERO_CELL
+        err_cell = _ERROR_STRONG_CELL[str(err_count)]
         report_btn = htpy.a(".btn.btn-sm.btn-outline-danger", href=report_url)["Show details"]
     elif warn_count > 0:
         path_display = htpy.strong[htpy.code(".text-warning")[path_str]]
-        pass_cell = (
-            htpy.span(".text-success", style=num_style)[str(pass_count)]
-            if (pass_count > 0)
-            else htpy.span(".text-muted", style=num_style)["0"]
-        )
-        warn_cell = htpy.span(".text-warning.fw-bold", style=num_style)[str(warn_count)]
-        err_cell = htpy.span(".text-muted", style=num_style)["0"]
+        pass_cell = _SUCCESS_CELL[str(pass_count)] if (pass_count > 0) else _MUTED_ZERO_CELL
+        warn_cell = _WARNING_STRONG_CELL[str(warn_count)]
+        err_cell = _MUTED_ZERO_CELL
         report_btn = htpy.a(".btn.btn-sm.btn-outline-warning", href=report_url)["Show details"]
     else:
         path_display = htpy.code[path_str]
-        pass_cell = htpy.span(".text-success", style=num_style)[str(pass_count)]
-        warn_cell = htpy.span(".text-muted", style=num_style)["0"]
-        err_cell = htpy.span(".text-muted", style=num_style)["0"]
+        pass_cell = _SUCCESS_CELL[str(pass_count)]
+        warn_cell = err_cell = _MUTED_ZERO_CELL
         report_btn = htpy.a(".btn.btn-sm.btn-outline-success", href=report_url)["Show details"]
 
     # <a href="{{ as_url(get.sbom.report, project=project_name, version=version_name, file_path=path) }}"
@@ -529,13 +595,17 @@ def _render_summary(
     paths: list[pathlib.Path],
     per_file_stats: dict[pathlib.Path, FileStats],
 ) -> None:
-    files_with_errors = sum(1 for s in per_file_stats.values() if s.file_err_after > 0)
-    files_with_warnings = sum(1 for s in per_file_stats.values() if (s.file_warn_after > 0) and (s.file_err_after == 0))
-    files_passed = sum(
-        1
-        for s in per_file_stats.values()
-        if (s.file_pass_after > 0) and (s.file_warn_after == 0) and (s.file_err_after == 0)
-    )
+    # Each file is in at most one category, by its most severe result, so one pass counts them all
+    files_with_errors = 0
+    files_with_warnings = 0
+    files_passed = 0
+    for s in per_file_stats.values():
+        if s.file_err_after > 0:
+            files_with_errors += 1
+        elif s.file_warn_after > 0:
+            files_with_warnings += 1
+        elif s.file_pass_after > 0:
+            files_passed += 1
     files_skipped = len(paths) - files_passed - files_with_warnings - files_with_errors
 
     file_word = "file" if (len(paths) == 1) else "files"
@@ -585,3 +655,27 @@ def _render_summary(
             "0 errors",
         ]
     page.append(summary_div.collect())
+
+
+def _stats_column(is_member: bool, status: sql.CheckResultStatus) -> int:
+    base = _STATS_MEMBER_OFFSET if is_member else 0
+    return base + _STATS_STATUS_OFFSETS[status]
+
+
+async def _stats_inputs(release: sql.Release, committee_name: str, session: web.Committer | None) -> _StatsInputs:
+    # The inputs depend only on the release revision, so they are computed at most once per request
+    cache: dict[tuple[str, str | None], _StatsInputs] = quart.g.setdefault("checks_stats_inputs", {})
+    key = (release.name, release.latest_revision_number)
+    if (cached := cache.get(key)) is not None:
+        return cached
+
+    # The directory walk and the two database reads are independent, so they overlap
+    # The gathered tasks cannot share the request session, so the reads use the read only pool
+    paths, match_ignore, (count_rows, ignorable_results) = await asyncio.gather(
+        _paths(release),
+        _ignores_matcher(session, committee_name),
+        _check_results(release),
+    )
+    inputs = _StatsInputs(paths, match_ignore, count_rows, ignorable_results)
+    cache[key] = inputs
+    return inputs
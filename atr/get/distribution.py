@@ -39,11 +39,11 @@ async def automate(session: web.Committer, project: str, version: str) -> str:
 
 @get.committer("/distributions/list/<project_name>/<version_name>")
 async def list_get(session: web.Committer, project_name: str, version_name: str) -> str:
-    distributions, tasks = await _get_page_data(project_name, version_name)
+    release, distributions, tasks = await _get_page_data(project_name, version_name)
+    shared.distribution.release_phase_validated(release, staging=None)
 
     block = htm.Block()
 
-    release = await shared.distribution.release_validated(project_name, version_name, staging=None)
     staging = release.phase == sql.ReleasePhase.RELEASE_CANDIDATE_DRAFT
     render.html_nav_phase(block, project_name, version_name, staging)
 
@@ -174,7 +174,9 @@ async def _automate_form_page(project: str, version: str, staging: bool) -> str:
     return await template.blank(title, content=block.collect())
 
 
-async def _get_page_data(project_name: str, version_name: str) -> tuple[Sequence[sql.Distribution], Sequence[sql.Task]]:
+async def _get_page_data(
+    project_name: str, version_name: str
+) -> tuple[sql.Release, Sequence[sql.Distribution], Sequence[sql.Task]]:
     """Get all the data needed to render the finish page."""
     async with db.session() as data:
         via = sql.validate_instrumented_attribute
@@ -184,7 +186,8 @@ async def _get_page_data(project_name: str, version_name: str) -> tuple[Sequence
         release = await data.release(
             project_name=project_name,
             version=version_name,
-            _committee=True,
+            _committee=False,
+            _project=False,
         ).demand(base.ASFQuartException("Release does not exist", errorcode=404))
         tasks = [
             t
@@ -203,7 +206,7 @@ async def _get_page_data(project_name: str, version_name: str) -> tuple[Sequence
             or (t.workflow and (t.workflow.status in ["in-progress", "failed"]))
         ]
 
-    return distributions, tasks
+    return release, distributions, tasks
 
 
 async def _record_form_page(project: str, version: str, staging: bool) -> str:
@@ -17,6 +17,8 @@
 
 from __future__ import annotations
 
+from typing import Final
+
 import asfquart.base as base
 import htpy
 import strictyaml
@@ -40,6 +42,13 @@ import atr.user as user
 import atr.util as util
 import atr.web as web
 
+_LISTED_PHASES: Final = (
+    sql.ReleasePhase.RELEASE_CANDIDATE_DRAFT,
+    sql.ReleasePhase.RELEASE_CANDIDATE,
+    sql.ReleasePhase.RELEASE_PREVIEW,
+    sql.ReleasePhase.RELEASE,
+)
+
 
 @get.committer("/project/add/<committee_name>")
 async def add_project(session: web.Committer, committee_name: str) -> web.WerkzeugResponse | str:
@@ -144,10 +153,12 @@ async def view(session: web.Committer, name: str) -> web.WerkzeugResponse | str:
     is_privileged = user.is_admin(session.uid)
     can_edit = is_committee_member or is_privileged
 
-    candidate_drafts = await interaction.candidate_drafts(project)
-    candidates = await interaction.candidates(project)
-    previews = await interaction.previews(project)
-    full_releases = await interaction.full_releases(project)
+    # Fetch every listed phase in one query, then split the releases by phase
+    releases = await interaction.releases_by_phases(project, _LISTED_PHASES)
+    candidate_drafts = [r for r in releases if (r.phase == sql.ReleasePhase.RELEASE_CANDIDATE_DRAFT)]
+    candidates = [r for r in releases if (r.phase == sql.ReleasePhase.RELEASE_CANDIDATE)]
+    previews = [r for r in releases if (r.phase == sql.ReleasePhase.RELEASE_PREVIEW)]
+    full_releases = [r for r in releases if (r.phase == sql.ReleasePhase.RELEASE)]
 
     page = htm.Block()
 
@@ -86,7 +86,7 @@ async def select(session: web.Committer, project_name: str) -> str:
         project = await data.project(name=project_name, status=sql.ProjectStatus.ACTIVE, _releases=True).demand(
             base.ASFQuartException(f"Project {project_name} not found", errorcode=404)
         )
-        releases = await interaction.releases_in_progress(project)
+        releases = await interaction.releases_in_progress(project, caller_data=data)
     return await template.render(
         "release-select.html", project=project, releases=releases, format_datetime=util.format_datetime
     )
@@ -64,6 +64,8 @@ ul = htpy.ul
 
 
 class BlockElementGetable:
+    __slots__ = ("block", "element")
+
     def __init__(self, block: Block, element: Element):
         self.block = block
         self.element = element
@@ -79,6 +81,8 @@ class BlockElementGetable:
 
 
 class BlockElementCallable:
+    __slots__ = ("block", "constructor")
+
     def __init__(self, block: Block, constructor: Callable[..., Element]):
         self.block = block
         self.constructor = constructor
@@ -96,6 +100,8 @@ class BlockElementCallable:
 
 class Block:
     __match_args__ = ("elements",)
+    # Many blocks are created for each page, so they do without an instance dictionary
+    __slots__ = ("classes", "element", "elements")
 
     def __init__(self, element: Element | None = None, *elements: Element, classes: str | None = None):
         self.element = element
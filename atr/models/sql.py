@@ -401,8 +401,12 @@ class Task(sqlmodel.SQLModel, table=True):
             self.completed = datetime.datetime.fromisoformat(self.completed.rstrip("Z"))
 
     # Create an index on status and added for efficient task claiming
+    # Create an index on release and task type, ordered by added, for finding the latest task of a type
     __table_args__ = (
         sqlalchemy.Index("ix_task_status_added", "status", "added"),
+        sqlalchemy.Index(
+            "ix_task_project_name_version_name_task_type_added", "project_name", "version_name", "task_type", "added"
+        ),
         # Ensure valid status transitions:
         # - QUEUED can transition to ACTIVE
         # - ACTIVE can transition to COMPLETED or FAILED
@@ -936,6 +940,13 @@ class CheckResult(sqlmodel.SQLModel, table=True):
     )
     input_hash: str | None = sqlmodel.Field(default=None, index=True, **example("blake3:7f83b1657ff1fc..."))
 
+    # Create an index on release, revision, and status for efficient failure lookups
+    __table_args__ = (
+        sqlalchemy.Index(
+            "ix_checkresult_release_name_revision_number_status", "release_name", "revision_number", "status"
+        ),
+    )
+
 
 class CheckResultIgnore(sqlmodel.SQLModel, table=True):
     id: int = sqlmodel.Field(default=None, primary_key=True, **example(123))
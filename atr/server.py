@@ -91,6 +91,8 @@ _MIGRATIONS: Final[list[tuple[str, str]]] = [
     ("tmp", "temporary"),
 ]
 
+_SAFE_METHODS: Final[frozenset[str]] = frozenset({"GET", "HEAD", "OPTIONS"})
+
 _SWAGGER_UI_TEMPLATE: Final[str] = """<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -420,6 +422,19 @@ def _app_setup_request_lifecycle(app: base.QuartApp) -> None:
         if session is not None:
             log.add_context(user_id=session.uid)
 
+    @app.before_request
+    async def open_request_session() -> None:
+        # Safe requests share one read only session between the read only helpers that would open their own
+        # Other requests keep separate sessions, so that reads after writes are not stale
+        if quart.request.method in _SAFE_METHODS:
+            quart.g.request_session_token = db.request_session_open()
+
+    @app.teardown_request
+    async def close_request_session(_exc: BaseException | None) -> None:
+        token = quart.g.pop("request_session_token", None)
+        if token is not None:
+            await db.request_session_close(token)
+
     @app.after_request
     async def log_request(response: quart.Response) -> quart.Response:
         logger.info(
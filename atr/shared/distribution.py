@@ -131,9 +131,7 @@ def html_tr_a(label: str, value: str | None) -> htm.Element:
     return htm.tr[htm.th[label], htm.td[htm.a(href=value)[value] if value else "-"]]
 
 
-async def release_validated(
-    project: str, version: str, committee: bool = False, staging: bool | None = None, release_policy: bool = False
-) -> sql.Release:
+def release_phase_validated(release: sql.Release, staging: bool | None = None) -> sql.Release:
     match staging:
         case True:
             phase = {sql.ReleasePhase.RELEASE_CANDIDATE_DRAFT}
@@ -141,6 +139,14 @@ async def release_validated(
             phase = {sql.ReleasePhase.RELEASE_PREVIEW}
         case None:
             phase = {sql.ReleasePhase.RELEASE_CANDIDATE_DRAFT, sql.ReleasePhase.RELEASE_PREVIEW}
+    if release.phase not in phase:
+        raise RuntimeError(f"Release {release.project_name} {release.version} is not in {phase}")
+    return release
+
+
+async def release_validated(
+    project: str, version: str, committee: bool = False, staging: bool | None = None, release_policy: bool = False
+) -> sql.Release:
     async with db.session() as data:
         release = await data.release(
             project_name=project,
@@ -148,8 +154,7 @@ async def release_validated(
             _committee=committee,
             _release_policy=release_policy,
         ).demand(RuntimeError(f"Release {project} {version} not found"))
-        if release.phase not in phase:
-            raise RuntimeError(f"Release {project} {version} is not in {phase}")
+        release_phase_validated(release, staging)
         # if release.project.status != sql.ProjectStatus.ACTIVE:
         #     raise RuntimeError(f"Project {project} is not active")
     return release
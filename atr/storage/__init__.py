@@ -401,12 +401,12 @@ class Write:
 
 
 @contextlib.asynccontextmanager
-async def read(asf_uid: principal.UID = principal.ArgumentNone) -> AsyncGenerator[Read]:
+async def read(asf_uid: principal.UID = principal.ArgumentNone, readonly: bool = False) -> AsyncGenerator[Read]:
     if asf_uid is principal.ArgumentNone:
         authorisation = await principal.Authorisation()
     else:
         authorisation = await principal.Authorisation(asf_uid)
-    async with db.session() as data:
+    async with db.session(readonly=readonly) as data:
         # TODO: Replace data with a DatabaseReader instance
         yield Read(authorisation, data)
 
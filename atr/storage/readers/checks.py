@@ -18,8 +18,9 @@
 # Removing this will cause circular imports
 from __future__ import annotations
 
+import functools
 import re
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Final, NamedTuple
 
 import atr.db as db
 import atr.models.sql as sql
@@ -28,7 +29,35 @@ import atr.storage.types as types
 
 if TYPE_CHECKING:
     import pathlib
-    from collections.abc import Callable
+    from collections.abc import Callable, Sequence
+
+_IGNORE_MATCHERS_MAX_ENTRIES: Final[int] = 256
+
+# Keyed by the content of the ignore rules, so that an edited rule can never be matched stale
+type _IgnoreRulesKey = tuple[tuple[str | None, ...], ...]
+_global_ignore_matchers: dict[_IgnoreRulesKey, Callable[[sql.CheckResult], bool]] = {}
+
+
+class _Glob(NamedTuple):
+    # A regex of None is the special "!" pattern, which only matches None
+    regex: re.Pattern[str] | None
+    negate: bool
+
+
+class _CompiledIgnore(NamedTuple):
+    release: _Glob | None
+    revision_number: str | None
+    checker: _Glob | None
+    primary_rel_path: _Glob | None
+    member_rel_path: _Glob | None
+    status: sql.CheckResultStatusIgnore | None
+    message: _Glob | None
+
+
+class _CompiledIgnores(NamedTuple):
+    # Each alternation combines the rules that only match one CheckResult attribute
+    alternations: tuple[tuple[str, re.Pattern[str]], ...]
+    rules: tuple[_CompiledIgnore, ...]
 
 
 class GeneralPublic:
@@ -101,62 +130,144 @@ class GeneralPublic:
             committee_name=committee_name,
         ).all()
 
-        def match(cr: sql.CheckResult) -> bool:
-            for ignore in ignores:
-                if self.__check_ignore_match(cr, ignore):
-                    # log.info(f"Ignoring check result {cr} due to ignore {ignore}")
-                    return True
-            return False
-
-        return match
-
-    def __check_ignore_match(self, cr: sql.CheckResult, cri: sql.CheckResultIgnore) -> bool:
-        # Does not check that the committee name matches
-        if cr.status == sql.CheckResultStatus.SUCCESS:
-            # Successes are never ignored
-            return False
-        if cri.release_glob is not None:
-            if not self.__check_ignore_match_pattern(cri.release_glob, cr.release_name):
-                return False
-        if cri.revision_number is not None:
-            if cri.revision_number != cr.revision_number:
-                return False
-        if cri.checker_glob is not None:
-            if not self.__check_ignore_match_pattern(cri.checker_glob, cr.checker):
-                return False
-        return self.__check_ignore_match_2(cr, cri)
-
-    def __check_ignore_match_2(self, cr: sql.CheckResult, cri: sql.CheckResultIgnore) -> bool:
-        if cri.primary_rel_path_glob is not None:
-            if not self.__check_ignore_match_pattern(cri.primary_rel_path_glob, cr.primary_rel_path):
-                return False
-        if cri.member_rel_path_glob is not None:
-            if not self.__check_ignore_match_pattern(cri.member_rel_path_glob, cr.member_rel_path):
-                return False
-        if cri.status is not None:
-            if cr.status != cri.status:
-                return False
-        if cri.message_glob is not None:
-            if not self.__check_ignore_match_pattern(cri.message_glob, cr.message):
-                return False
-        return True
-
-    def __check_ignore_match_pattern(self, pattern: str | None, value: str | None) -> bool:
-        if pattern == "!":
-            # Special case, "!" matches None
-            return True if (value is None) else False
-        if (pattern is None) or (value is None):
-            return False
-        negate = False
-        if pattern.startswith("!"):
-            pattern = pattern[1:]
-            negate = True
-        if pattern.startswith("^") or pattern.endswith("$"):
-            regex = re.compile(pattern)
+        # Compiling the globs is the expensive part, so it is only done when the rules change
+        key = tuple(
+            (
+                cri.release_glob,
+                cri.revision_number,
+                cri.checker_glob,
+                cri.primary_rel_path_glob,
+                cri.member_rel_path_glob,
+                cri.status,
+                cri.message_glob,
+            )
+            for cri in ignores
+        )
+        if (matcher := _global_ignore_matchers.get(key)) is not None:
+            return matcher
+
+        compiled = _compile_ignores(ignores)
+        matcher = functools.partial(_ignores_match, compiled)
+        if len(_global_ignore_matchers) >= _IGNORE_MATCHERS_MAX_ENTRIES:
+            _global_ignore_matchers.clear()
+        _global_ignore_matchers[key] = matcher
+        return matcher
+
+
+def _compile_glob(pattern: str | None) -> _Glob | None:
+    if pattern is None:
+        return None
+    if pattern == "!":
+        # Special case, "!" matches None
+        return _Glob(None, False)
+    negate = False
+    if pattern.startswith("!"):
+        pattern = pattern[1:]
+        negate = True
+    if pattern.startswith("^") or pattern.endswith("$"):
+        regex = re.compile(pattern)
+    else:
+        regex = re.compile(re.escape(pattern).replace(r"\*", ".*"))
+        # Should maybe add .replace(r"\?", ".?")
+    return _Glob(regex, negate)
+
+
+def _compile_ignore(cri: sql.CheckResultIgnore) -> _CompiledIgnore:
+    return _CompiledIgnore(
+        release=_compile_glob(cri.release_glob),
+        revision_number=cri.revision_number,
+        checker=_compile_glob(cri.checker_glob),
+        primary_rel_path=_compile_glob(cri.primary_rel_path_glob),
+        member_rel_path=_compile_glob(cri.member_rel_path_glob),
+        status=cri.status,
+        message=_compile_glob(cri.message_glob),
+    )
+
+
+def _compile_ignores(ignores: Sequence[sql.CheckResultIgnore]) -> _CompiledIgnores:
+    patterns_by_attribute: dict[str, list[str]] = {}
+    rules = []
+    for cri in ignores:
+        ci = _compile_ignore(cri)
+        single = _single_attribute_regex(ci)
+        if single is None:
+            rules.append(ci)
         else:
-            regex = re.compile(re.escape(pattern).replace(r"\*", ".*"))
-            # Should maybe add .replace(r"\?", ".?")
-        matched = regex.search(value) is not None
-        if negate:
-            return not matched
-        return matched
+            attribute, regex = single
+            patterns_by_attribute.setdefault(attribute, []).append(regex.pattern)
+    # Rules that only constrain one attribute are searched together in a single scan
+    alternations = tuple(
+        (attribute, re.compile("|".join(f"(?:{pattern})" for pattern in patterns)))
+        for attribute, patterns in patterns_by_attribute.items()
+    )
+    return _CompiledIgnores(alternations, tuple(rules))
+
+
+def _glob_match(glob: _Glob, value: str | None) -> bool:
+    if glob.regex is None:
+        return value is None
+    if value is None:
+        return False
+    matched = glob.regex.search(value) is not None
+    if glob.negate:
+        return not matched
+    return matched
+
+
+def _ignore_match(cr: sql.CheckResult, ci: _CompiledIgnore) -> bool:
+    # Does not check that the committee name matches
+    if (ci.release is not None) and (not _glob_match(ci.release, cr.release_name)):
+        return False
+    if (ci.revision_number is not None) and (ci.revision_number != cr.revision_number):
+        return False
+    if (ci.checker is not None) and (not _glob_match(ci.checker, cr.checker)):
+        return False
+    if (ci.primary_rel_path is not None) and (not _glob_match(ci.primary_rel_path, cr.primary_rel_path)):
+        return False
+    if (ci.member_rel_path is not None) and (not _glob_match(ci.member_rel_path, cr.member_rel_path)):
+        return False
+    if (ci.status is not None) and (cr.status != ci.status):
+        return False
+    if (ci.message is not None) and (not _glob_match(ci.message, cr.message)):
+        return False
+    return True
+
+
+def _ignores_match(compiled: _CompiledIgnores, cr: sql.CheckResult) -> bool:
+    if cr.status == sql.CheckResultStatus.SUCCESS:
+        # Successes are never ignored
+        return False
+    for attribute, regex in compiled.alternations:
+        value = getattr(cr, attribute)
+        if (value is not None) and (regex.search(value) is not None):
+            return True
+    for ci in compiled.rules:
+        if _ignore_match(cr, ci):
+            # log.info(f"Ignoring check result {cr} due to ignore {ci}")
+            return True
+    return False
+
+
+def _single_attribute_regex(ci: _CompiledIgnore) -> tuple[str, re.Pattern[str]] | None:
+    if (ci.revision_number is not None) or (ci.status is not None):
+        return None
+    globs = [
+        (attribute, glob)
+        for attribute, glob in (
+            ("release_name", ci.release),
+            ("checker", ci.checker),
+            ("primary_rel_path", ci.primary_rel_path),
+            ("member_rel_path", ci.member_rel_path),
+            ("message", ci.message),
+        )
+        if glob is not None
+    ]
+    if len(globs) != 1:
+        return None
+    attribute, glob = globs[0]
+    if (glob.regex is None) or glob.negate:
+        return None
+    # Groups would be renumbered and inline flags must come first, so such patterns are not combined
+    if (glob.regex.groups > 0) or glob.regex.pattern.startswith("(?"):
+        return None
+    return attribute, glob.regex
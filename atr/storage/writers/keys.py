@@ -36,6 +36,7 @@ import sqlmodel
 
 import atr.config as config
 import atr.db as db
+import atr.db.interaction as interaction
 import atr.log as log
 import atr.models.sql as sql
 import atr.storage as storage
@@ -81,6 +82,7 @@ class FoundationCommitter(GeneralPublic):
             ).demand(storage.AccessError(f"Key not found: {fingerprint}"))
             await self.__data.delete(key)
             await self.__data.commit()
+            interaction.invalidate_automated_release_signing_committees()
             for committee in key.committees:
                 wacm = self.__write.as_committee_member_outcome(committee.name).result_or_none()
                 if wacm is None:
@@ -202,6 +204,7 @@ class FoundationCommitter(GeneralPublic):
                 deleted_count += 1
 
             await self.__data.commit()
+            interaction.invalidate_automated_release_signing_committees()
             return outcome.Result(deleted_count)
         except Exception as e:
             return outcome.Error(e)
@@ -396,6 +399,7 @@ class CommitteeParticipant(FoundationCommitter):
                 # return storage.OutcomeException(e)
                 pass
             await self.__data.commit()
+            interaction.invalidate_automated_release_signing_committees()
         except Exception as e:
             return outcome.Error(e)
         try:
@@ -603,6 +607,7 @@ class CommitteeParticipant(FoundationCommitter):
             log.info("Inserted 0 key links (none to insert)")
 
         await self.__data.commit()
+        interaction.invalidate_automated_release_signing_committees()
         return outcomes
 
     async def __ensure(self, keys_file_text: str, associate: bool = True) -> outcome.List[types.Key]:
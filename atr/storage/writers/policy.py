@@ -23,6 +23,7 @@ from typing import TYPE_CHECKING
 import strictyaml
 
 import atr.db as db
+import atr.db.interaction as interaction
 import atr.models as models
 import atr.storage as storage
 import atr.util as util
@@ -158,6 +159,7 @@ class CommitteeMember(CommitteeParticipant):
 
     async def __commit_and_log(self, project_name: str) -> None:
         await self.__data.commit()
+        interaction.invalidate_trusted_projects()
         self.__write_as.append_to_audit_log(
             asf_uid=self.__asf_uid,
             project_name=project_name,
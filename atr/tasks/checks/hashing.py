@@ -17,6 +17,7 @@
 
 import hashlib
 import secrets
+from typing import Final
 
 import aiofiles
 
@@ -24,6 +25,9 @@ import atr.log as log
 import atr.models.results as results
 import atr.tasks.checks as checks
 
+# Large reads keep the number of thread round trips low, and hashlib releases the GIL for them
+_HASH_CHUNK_SIZE: Final[int] = 4 * 1024 * 1024
+
 
 async def check(args: checks.FunctionArguments) -> results.Results | None:
     """Check the hash of a file."""
@@ -52,7 +56,7 @@ async def check(args: checks.FunctionArguments) -> results.Results | None:
     hash_obj = hash_func()
     try:
         async with aiofiles.open(artifact_abs_path, mode="rb") as f:
-            while chunk := await f.read(4096):
+            while chunk := await f.read(_HASH_CHUNK_SIZE):
                 hash_obj.update(chunk)
         computed_hash = hash_obj.hexdigest()
 
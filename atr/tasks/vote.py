@@ -75,7 +75,9 @@ async def _initiate_core_logic(args: Initiate) -> results.Results | None:
         if latest_revision_number is None:
             raise VoteInitiationError(f"No revisions found for release {args.release_name}")
 
-        ongoing_tasks = await interaction.tasks_ongoing(release.project.name, release.version, latest_revision_number)
+        ongoing_tasks = await interaction.tasks_ongoing(
+            release.project.name, release.version, latest_revision_number, caller_data=data
+        )
         if ongoing_tasks > 0:
             raise VoteInitiationError(f"Cannot start vote for {args.release_name} as {ongoing_tasks} are not complete")
 
@@ -19,20 +19,23 @@
 
 import functools
 
+import sqlalchemy.orm as orm
+
 import atr.config as config
 import atr.db as db
 import atr.models.sql as sql
 
 
 async def candidate_drafts(uid: str, user_projects: list[sql.Project] | None = None) -> list[sql.Release]:
-    # Must be imported here, to avoid a circular import
-    import atr.db.interaction as interaction
-
     if user_projects is None:
         user_projects = await projects(uid)
     user_candidate_drafts: list[sql.Release] = []
+    # The projects are loaded with their releases, so the drafts are filtered without further queries
     for p in user_projects:
-        releases = await interaction.candidate_drafts(p)
+        releases = [r for r in p.releases if (r.phase == sql.ReleasePhase.RELEASE_CANDIDATE_DRAFT)]
+        releases.sort(key=lambda r: r.created, reverse=True)
+        for release in releases:
+            orm.attributes.set_committed_value(release, "project", p)
         user_candidate_drafts.extend(releases)
     return user_candidate_drafts
 
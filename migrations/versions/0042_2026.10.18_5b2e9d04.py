@@ -0,0 +1,30 @@
+"""Add a check result index for failure lookups
+
+Revision ID: 0042_2026.10.18_5b2e9d04
+Revises: 0041_2026.01.22_d1e357f5
+Create Date: 2026-10-18 09:12:44.318520+00:00
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# Revision identifiers, used by Alembic
+revision: str = "0042_2026.10.18_5b2e9d04"
+down_revision: str | None = "0041_2026.01.22_d1e357f5"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("checkresult", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_checkresult_release_name_revision_number_status",
+            ["release_name", "revision_number", "status"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("checkresult", schema=None) as batch_op:
+        batch_op.drop_index("ix_checkresult_release_name_revision_number_status")
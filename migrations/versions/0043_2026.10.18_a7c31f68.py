@@ -0,0 +1,30 @@
+"""Add a task index for finding the latest task of a type
+
+Revision ID: 0043_2026.10.18_a7c31f68
+Revises: 0042_2026.10.18_5b2e9d04
+Create Date: 2026-10-18 11:40:07.902114+00:00
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# Revision identifiers, used by Alembic
+revision: str = "0043_2026.10.18_a7c31f68"
+down_revision: str | None = "0042_2026.10.18_5b2e9d04"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("task", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_task_project_name_version_name_task_type_added",
+            ["project_name", "version_name", "task_type", "added"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("task", schema=None) as batch_op:
+        batch_op.drop_index("ix_task_project_name_version_name_task_type_added")
@@ -0,0 +1,96 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import enum
+from typing import Annotated, Literal
+
+import pydantic
+import pytest
+
+import atr.form as form
+
+type ALPHA = Literal["alpha"]
+type BETA = Literal["beta"]
+
+
+class Colour(enum.Enum):
+    RED = "red"
+    GREEN = "green"
+
+
+class AlphaForm(form.Form):
+    variant: ALPHA = form.value(ALPHA)
+    count: form.Int = form.label("Count of things")
+
+
+class BetaForm(form.Form):
+    variant: BETA = form.value(BETA)
+    colour: form.Enum[Colour] = form.label("Colour")
+    colours: form.Set[Colour] = form.label("Colours")
+
+
+type AlphaOrBetaForm = Annotated[AlphaForm | BetaForm, form.DISCRIMINATOR]
+
+
+def test_flash_error_data_does_not_cache_undeclared_fields():
+    data = {"variant": "alpha", "count": "1", **{f"junk_{i}": "x" for i in range(10)}}
+    with pytest.raises(pydantic.ValidationError) as exc_info:
+        form.validate(AlphaOrBetaForm, data)
+    before = form._declared_field_label.cache_info().currsize
+
+    flashed = form.flash_error_data(AlphaOrBetaForm, exc_info.value.errors(), data)
+
+    assert flashed["junk_3"]["label"] == "Junk 3"
+    assert form._declared_field_label.cache_info().currsize <= before + 2
+
+
+def test_flash_error_data_does_not_modify_errors():
+    with pytest.raises(pydantic.ValidationError) as exc_info:
+        form.validate(AlphaOrBetaForm, {"variant": "alpha", "count": "many"})
+    errors = exc_info.value.errors()
+    locs_before = [error["loc"] for error in errors]
+
+    first = form.flash_error_data(AlphaOrBetaForm, errors, {"variant": "alpha", "count": "many"})
+    second = form.flash_error_data(AlphaOrBetaForm, errors, {"variant": "alpha", "count": "many"})
+
+    assert [error["loc"] for error in errors] == locs_before
+    assert first == second
+    assert first["count"]["label"] == "Count of things"
+    assert first["count"]["msg"] == "Invalid integer value: 'many'"
+    assert first["!variant"] == {"original": "alpha"}
+
+
+def test_to_enum_and_to_enum_set_use_member_values():
+    validated = form.validate(BetaForm, {"variant": "beta", "colour": "green", "colours": ["red", "blue"]})
+    assert isinstance(validated, BetaForm)
+    assert validated.colour is Colour.GREEN
+    assert validated.colours == {Colour.RED}
+
+
+def test_to_filename_rejects_null_bytes_before_separators():
+    with pytest.raises(ValueError, match="null bytes"):
+        form.to_filename("a/\0")
+    with pytest.raises(ValueError, match="path separators"):
+        form.to_filename("a\\b")
+
+
+def test_to_relpath_rejects_forbidden_sequences():
+    with pytest.raises(ValueError, match="backslashes"):
+        form.to_relpath("a\\b")
+    with pytest.raises(ValueError, match="//"):
+        form.to_relpath("a//b")
+    assert str(form.to_relpath("a/b")) == "a/b"
@@ -0,0 +1,105 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import collections
+import itertools
+import pathlib
+
+import atr.get.checks as checks
+import atr.models.sql as sql
+
+PATHS = [pathlib.Path("a.tar.gz"), pathlib.Path("b.zip"), pathlib.Path("c/d.txt"), pathlib.Path("e.txt")]
+PRIMARY_REL_PATHS = ("a.tar.gz", "b.zip", "c/d.txt", "c//d.txt", "unknown.txt", "", None)
+
+
+def test_compute_stats_counts_every_result_once():
+    results = _check_results()
+    stats, totals = _compute_stats(results)
+    expected_stats, expected_totals = _reference_stats(results)
+    assert stats == expected_stats
+    assert totals == expected_totals
+    assert totals.total_err_before > totals.total_err_after
+
+
+def test_compute_stats_without_results_is_empty():
+    stats, totals = _compute_stats([])
+    assert stats == dict.fromkeys(PATHS, checks.FileStats(*([0] * 12)))
+    assert totals == checks.FileStats(*([0] * 12))
+
+
+def _check_results() -> list[sql.CheckResult]:
+    return [
+        sql.CheckResult(
+            release_name="example-0.0.1",
+            revision_number="00001",
+            checker=f"checker.{copy}",
+            primary_rel_path=primary_rel_path,
+            member_rel_path=member_rel_path,
+            status=status,
+            message="",
+        )
+        for primary_rel_path, member_rel_path, status, copy in itertools.product(
+            PRIMARY_REL_PATHS, (None, "member.txt"), sql.CheckResultStatus, range(2)
+        )
+    ]
+
+
+def _compute_stats(
+    results: list[sql.CheckResult],
+) -> tuple[dict[pathlib.Path, checks.FileStats], checks.FileStats]:
+    # Group the results as the count query does, and pass the non success results as the ignorable query does
+    counts = collections.Counter((cr.primary_rel_path, cr.member_rel_path is not None, cr.status) for cr in results)
+    count_rows = [(*key, count) for key, count in counts.items()]
+    ignorable_results = [cr for cr in results if (cr.status != sql.CheckResultStatus.SUCCESS)]
+    return checks._compute_stats(PATHS, _match_ignore, count_rows, ignorable_results)  # type: ignore[arg-type]
+
+
+def _match_ignore(cr: sql.CheckResult) -> bool:
+    if cr.status == sql.CheckResultStatus.SUCCESS:
+        return False
+    return (cr.checker == "checker.0") or (cr.member_rel_path is not None)
+
+
+def _reference_stats(
+    results: list[sql.CheckResult],
+) -> tuple[dict[pathlib.Path, checks.FileStats], checks.FileStats]:
+    # Count each result one by one, as the statistics were computed before the counting moved to SQL
+    per_file = {p: collections.Counter() for p in PATHS}
+    for cr in results:
+        if not cr.primary_rel_path:
+            continue
+        file_path = pathlib.Path(cr.primary_rel_path)
+        if file_path not in per_file:
+            continue
+        prefix = "member" if (cr.member_rel_path is not None) else "file"
+        if cr.status == sql.CheckResultStatus.SUCCESS:
+            kind = "pass"
+        elif cr.status == sql.CheckResultStatus.WARNING:
+            kind = "warn"
+        else:
+            kind = "err"
+        per_file[file_path][f"{prefix}_{kind}_before"] += 1
+        if not _match_ignore(cr):
+            per_file[file_path][f"{prefix}_{kind}_after"] += 1
+
+    fields = [
+        f"{prefix}_{kind}_{when}"
+        for prefix, when, kind in itertools.product(("file", "member"), ("before", "after"), ("pass", "warn", "err"))
+    ]
+    stats = {p: checks.FileStats(*(counter[field] for field in fields)) for p, counter in per_file.items()}
+    totals = checks.FileStats(*(sum(counter[field] for counter in per_file.values()) for field in fields))
+    return stats, totals
@@ -0,0 +1,124 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import itertools
+import re
+
+import atr.models.sql as sql
+import atr.storage.readers.checks as checks
+
+GLOB_FIELDS = ("release_glob", "checker_glob", "primary_rel_path_glob", "member_rel_path_glob", "message_glob")
+PATTERNS = ("!", "a*", "!a*", "^ab", "b$", "ab", "x.y", "^(a|b)c", "(?i)AB$", "*")
+VALUES = (None, "a", "ab", "abc", "bc", "x.y", "xzy")
+
+
+def test_compile_ignores_only_combines_plain_single_attribute_rules():
+    compiled = checks._compile_ignores(
+        [
+            _ignore(checker_glob="ab"),
+            _ignore(checker_glob="b$"),
+            _ignore(checker_glob="!ab"),
+            _ignore(checker_glob="!"),
+            _ignore(checker_glob="^(a|b)c"),
+            _ignore(checker_glob="(?i)AB$"),
+            _ignore(checker_glob="ab", status=sql.CheckResultStatusIgnore.FAILURE),
+            _ignore(checker_glob="ab", message_glob="ab"),
+        ]
+    )
+    assert [attribute for attribute, _ in compiled.alternations] == ["checker"]
+    assert len(compiled.rules) == 6
+
+
+def test_ignores_match_agrees_with_per_rule_matching_for_combined_rules():
+    ignores = [
+        _ignore(primary_rel_path_glob="a*", member_rel_path_glob="!"),
+        _ignore(checker_glob="!^a", revision_number="00002"),
+        _ignore(message_glob="x.y", status=sql.CheckResultStatusIgnore.WARNING),
+        _ignore(release_glob="^(a|b)c"),
+        _ignore(release_glob="xzy"),
+    ]
+    compiled = checks._compile_ignores(ignores)
+    for cr in _check_results():
+        assert checks._ignores_match(compiled, cr) == _reference_match(cr, ignores)
+
+
+def test_ignores_match_agrees_with_per_rule_matching_for_single_globs():
+    for field, pattern in itertools.product(GLOB_FIELDS, PATTERNS):
+        ignores = [_ignore(**{field: pattern}), _ignore(**{field: "xzy"})]
+        compiled = checks._compile_ignores(ignores)
+        for cr in _check_results():
+            assert checks._ignores_match(compiled, cr) == _reference_match(cr, ignores), (field, pattern, cr)
+
+
+def _check_results() -> list[sql.CheckResult]:
+    return [
+        sql.CheckResult(
+            release_name=value or "",
+            revision_number=revision_number,
+            checker=value or "",
+            primary_rel_path=value,
+            member_rel_path=member_value,
+            status=status,
+            message=value or "",
+        )
+        for value, member_value, revision_number, status in itertools.product(
+            VALUES, VALUES, (None, "00002"), sql.CheckResultStatus
+        )
+    ]
+
+
+def _ignore(**kwargs: str | sql.CheckResultStatusIgnore | None) -> sql.CheckResultIgnore:
+    fields = dict.fromkeys((*GLOB_FIELDS, "revision_number"))
+    fields.update(kwargs)
+    return sql.CheckResultIgnore(asf_uid="user", committee_name="committee", **fields)
+
+
+def _reference_glob_match(pattern: str, value: str | None) -> bool:
+    # The matching of a single glob before rules were compiled and combined
+    if pattern == "!":
+        return value is None
+    if value is None:
+        return False
+    negate = pattern.startswith("!")
+    if negate:
+        pattern = pattern[1:]
+    if pattern.startswith("^") or pattern.endswith("$"):
+        regex = re.compile(pattern)
+    else:
+        regex = re.compile(re.escape(pattern).replace(r"\*", ".*"))
+    return (regex.search(value) is not None) != negate
+
+
+def _reference_match(cr: sql.CheckResult, ignores: list[sql.CheckResultIgnore]) -> bool:
+    if cr.status == sql.CheckResultStatus.SUCCESS:
+        return False
+    for cri in ignores:
+        globs = (
+            (cri.release_glob, cr.release_name),
+            (cri.checker_glob, cr.checker),
+            (cri.primary_rel_path_glob, cr.primary_rel_path),
+            (cri.member_rel_path_glob, cr.member_rel_path),
+            (cri.message_glob, cr.message),
+        )
+        if any((pattern is not None) and (not _reference_glob_match(pattern, value)) for pattern, value in globs):
+            continue
+        if (cri.revision_number is not None) and (cri.revision_number != cr.revision_number):
+            continue
+        if (cri.status is not None) and (cr.status != cri.status):
+            continue
+        return True
+    return False